@@ -18,14 +18,14 @@ if 'games' not in st.session_state:
         'tic_tac_toe': {'board': [[' ' for _ in range(3)] for _ in range(3)], 'current_player': 'X', 'winner': None},
         'n_queens': {
             'size': 8,
-            'solutions': [],
+            'pager': None,
             'current_solution': 0,
             'user_board': None,
             'mode': 'visualize'
         },
         'sudoku': {'board': [[0 for _ in range(9)] for _ in range(9)], 'original': None, 'solution': None},
         'connect4': {'board': [[0 for _ in range(7)] for _ in range(6)], 'current_player': 1, 'winner': None},
-        '2048': {'board': initialize_2048(), 'score': 0, 'game_over': False},
+        '2048': {'board': initialize_2048(), 'score': 0, 'game_over': False, 'size': 4},
         'hangman': {'word': '', 'guessed': [], 'wrong_guesses': 0, 'max_wrong': 6},
         'maze': {'grid': None, 'start': None, 'end': None, 'player_pos': None, 'path': None, 'size': 10}
     }
@@ -34,7 +34,7 @@ if 'leaderboard' not in st.session_state:
     st.session_state.leaderboard = {
         'tic_tac_toe': {'wins': {}, 'times': {}},
         'connect4': {'wins': {}, 'times': {}},
-        '2048': {'high_scores': {}, 'times': {}},  # Changed from 'scores' to 'high_scores'
+        '2048': {'high_scores': {}, 'times': {}, 'replays': {}},  # Changed from 'scores' to 'high_scores'
         'hangman': {'wins': {}, 'times': {}},
         'maze': {'completions': {}, 'times': {}},  # Changed from 'scores' to 'completions'
         'n_queens': {'solutions': {}, 'times': {}}  # Changed from 'wins' to 'solutions'
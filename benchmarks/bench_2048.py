@@ -0,0 +1,47 @@
+# benchmarks/bench_2048.py
+#
+# Games per second of the batched 2048 simulator against playing the same
+# strategy one game at a time through move_2048 from the 2048 page. Both
+# play the corner strategy (down, else left, else right, else up).
+# Run from the repository root:  python -m benchmarks.bench_2048
+# or pick the batch sizes:        python -m benchmarks.bench_2048 100 10000
+
+import random
+import sys
+import time
+
+from games.game_2048 import initialize_2048, move_2048
+from games.game_2048_sim import corner_policy, simulate
+
+CORNER_ORDER = ('down', 'left', 'right', 'up')
+
+
+def play_one_at_a_time(games):
+    scores = []
+    for _ in range(games):
+        game_state = {'board': initialize_2048(), 'score': 0, 'game_over': False}
+        while not game_state['game_over']:
+            if not any(move_2048(game_state, direction) for direction in CORNER_ORDER):
+                break
+        scores.append(game_state['score'])
+    return scores
+
+
+def main(batches=(100, 1000, 10000), serial_games=200):
+    random.seed(0)
+    start = time.perf_counter()
+    scores = play_one_at_a_time(serial_games)
+    serial = serial_games / (time.perf_counter() - start)
+    print(f"{'games':>7}{'mode':>10}{'games/s':>10}{'speedup':>9}{'mean score':>12}")
+    print(f"{serial_games:>7}{'serial':>10}{serial:>10.0f}{1:>9.1f}{sum(scores) / len(scores):>12.0f}")
+    for games in batches:
+        results = simulate(corner_policy, games, seed=0)
+        rate = results['games_per_second']
+        print(f"{games:>7}{'batched':>10}{rate:>10.0f}{rate / serial:>9.1f}{results['scores'].mean():>12.0f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main(tuple(int(arg) for arg in sys.argv[1:]))
+    else:
+        main()
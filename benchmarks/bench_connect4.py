@@ -0,0 +1,101 @@
+# benchmarks/bench_connect4.py
+#
+# Raw move generation and win-check speed of the Connect 4 bitboard, as a
+# perft count (every legal line of play to a fixed depth, stopping at wins),
+# fixed-depth iterative deepening with and without a transposition table,
+# and how the multi-core search scales with the number of worker processes.
+# Run from the repository root:  python -m benchmarks.bench_connect4
+
+import os
+import time
+
+from games.connect4_ai import MOVE_ORDER, Search, TranspositionTable, choose_move
+from games.connect4_engine import Bitboard
+from games.connect4_parallel import choose_move_parallel, shutdown_pool
+
+
+def perft(bitboard, depth, player):
+    if depth == 0:
+        return 1
+    nodes = 0
+    for col in bitboard.legal_moves():
+        bitboard.play(col, player)
+        if bitboard.is_win(player):
+            nodes += 1
+        else:
+            nodes += perft(bitboard, depth - 1, 3 - player)
+        bitboard.undo()
+    return nodes
+
+
+def main(max_depth=7):
+    print(f"{'depth':<8}{'nodes':>12}{'seconds':>10}{'nodes/s':>12}")
+    for depth in range(1, max_depth + 1):
+        start = time.perf_counter()
+        nodes = perft(Bitboard(), depth, 1)
+        elapsed = time.perf_counter() - start
+        print(f"{depth:<8}{nodes:>12}{elapsed:>10.3f}{nodes / elapsed:>12.0f}")
+
+
+def deepen(bitboard, player, max_depth, table):
+    search = Search(bitboard.copy(), player, float("inf"), table)
+    order = [col for col in MOVE_ORDER if bitboard.can_play(col)]
+    for depth in range(1, max_depth + 1):
+        col, _ = search.root(depth, order)
+        order.remove(col)
+        order.insert(0, col)
+    return search.nodes
+
+
+def bench_table(max_depth=8, openings=("", "33", "3324", "332415")):
+    print(f"{'opening':<10}{'plain nodes':>12}{'ms':>8}{'tt nodes':>12}{'ms':>8}{'hit rate':>10}")
+    for opening in openings:
+        bitboard = Bitboard()
+        player = 1
+        for ch in opening:
+            bitboard.play(int(ch), player)
+            player = 3 - player
+        start = time.perf_counter()
+        plain = deepen(bitboard, player, max_depth, None)
+        plain_time = time.perf_counter() - start
+        table = TranspositionTable()
+        start = time.perf_counter()
+        with_table = deepen(bitboard, player, max_depth, table)
+        table_time = time.perf_counter() - start
+        print(
+            f"{opening or '-':<10}{plain:>12}{plain_time * 1000:>8.0f}"
+            f"{with_table:>12}{table_time * 1000:>8.0f}{table.hit_rate:>10.1%}"
+        )
+
+
+def bench_parallel(max_depth=9, opening="3324", max_workers=None):
+    """Fixed-depth search on one position, serially and with 1..N workers."""
+    bitboard = Bitboard()
+    player = 1
+    for ch in opening:
+        bitboard.play(int(ch), player)
+        player = 3 - player
+    max_workers = max_workers or os.cpu_count() or 1
+    print(f"{'workers':<10}{'col':>5}{'nodes':>12}{'ms':>8}{'nodes/s':>12}{'speedup':>9}")
+    col, info = choose_move(bitboard, player, time_budget=float("inf"), max_depth=max_depth, table=TranspositionTable())
+    serial = info['seconds']
+    print(f"{'serial':<10}{col:>5}{info['nodes']:>12}{serial * 1000:>8.0f}{info['nodes'] / serial:>12.0f}{1:>9.2f}")
+    counts = sorted({2 ** k for k in range(max_workers.bit_length()) if 2 ** k <= max_workers} | {max_workers})
+    for workers in counts:
+        choose_move_parallel(bitboard, player, time_budget=1.0, max_depth=2, workers=workers)  # start the pool
+        col, info = choose_move_parallel(
+            bitboard, player, time_budget=float("inf"), max_depth=max_depth, table=TranspositionTable(), workers=workers
+        )
+        print(
+            f"{workers:<10}{col:>5}{info['nodes']:>12}{info['seconds'] * 1000:>8.0f}"
+            f"{info['nps']:>12.0f}{serial / info['seconds']:>9.2f}"
+        )
+    shutdown_pool()
+
+
+if __name__ == "__main__":
+    main()
+    print()
+    bench_table()
+    print()
+    bench_parallel()
@@ -0,0 +1,44 @@
+# benchmarks/bench_n_queens.py
+#
+# CPU scaling of the multi-process N-Queens counter: each board size is
+# counted serially and then on 1, 2, 4, ... worker processes up to the core
+# count, with every total checked against the published values.
+# Run from the repository root:  python -m benchmarks.bench_n_queens
+# or pick the sizes:              python -m benchmarks.bench_n_queens 16 17 18
+
+import os
+import sys
+import time
+
+from games.n_queens_count import KNOWN_TOTALS, parallel_count
+from games.n_queens_engine import count_solutions
+
+
+def worker_counts(max_workers):
+    return sorted({2 ** k for k in range(max_workers.bit_length()) if 2 ** k <= max_workers} | {max_workers})
+
+
+def main(sizes=(12, 13, 14), max_workers=None):
+    max_workers = max_workers or os.cpu_count() or 1
+    print(f"{'N':<4}{'workers':<9}{'solutions':>12}{'check':>7}{'wall s':>9}{'speedup':>9}{'busiest s':>11}{'idlest s':>10}")
+    for size in sizes:
+        start = time.perf_counter()
+        total = count_solutions(size)
+        serial = time.perf_counter() - start
+        check = "ok" if KNOWN_TOTALS.get(size) == total else "WRONG"
+        print(f"{size:<4}{'serial':<9}{total:>12}{check:>7}{serial:>9.2f}{1:>9.2f}")
+        for workers in worker_counts(max_workers):
+            total, stats = parallel_count(size, workers)
+            check = "ok" if KNOWN_TOTALS.get(size) == total else "WRONG"
+            busy = stats['worker_seconds']
+            print(
+                f"{size:<4}{workers:<9}{total:>12}{check:>7}{stats['wall']:>9.2f}"
+                f"{serial / stats['wall']:>9.2f}{busy[0]:>11.2f}{busy[-1]:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main(tuple(int(arg) for arg in sys.argv[1:]))
+    else:
+        main()
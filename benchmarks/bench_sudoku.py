@@ -0,0 +1,121 @@
+# benchmarks/bench_sudoku.py
+#
+# Solve time of the bitmask engine on a set of well-known hard puzzles,
+# generation time of unique-solution puzzles per difficulty, and generation
+# and solve time on 16x16 and 25x25 boards, both generated ones (which
+# singles alone open up) and sparse ones blanked at random from a full grid.
+# Run from the repository root:  python -m benchmarks.bench_sudoku
+
+import random
+import time
+
+from games.sudoku_engine import DIFFICULTIES, BitmaskSolver, generate_puzzle, random_full_grid, solve_cells
+
+HARD_PUZZLES = {
+    "AI Escargot": "1....7.9..3..2...8..96..5....53..9...1..8...26....4...3......1..4......7..7...3..",
+    "Inkala 2012": "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..",
+    "Norvig hardest": "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......",
+    "Golden Nugget": ".......39.....1..5..3.5.8....8.9...6.7...2...1..4.......9.8..5..2....6..4..7.....",
+    "Easter Monster": "1.......2.9.4...5...6...7...5.9.3.......7.......85..4.7.....6...3...9.8...2.....1",
+    "Anti-backtracking": "..............3.85..1.2.......5.7.....4...1...9.......5......73..2.1........4...9",
+}
+
+
+def parse(line):
+    return [int(ch) if ch.isdigit() else 0 for ch in line.strip()]
+
+
+def is_solution(puzzle, cells):
+    if any(p and p != c for p, c in zip(puzzle, cells)):
+        return False
+    solver = BitmaskSolver(cells)
+    return solver.valid and all(cells)
+
+
+def main(repeat=5):
+    total = 0.0
+    print(f"{'puzzle':<20}{'best ms':>10}{'ok':>5}")
+    for name, line in HARD_PUZZLES.items():
+        puzzle = parse(line)
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            solution = solve_cells(puzzle)
+            best = min(best, time.perf_counter() - start)
+        ok = solution is not None and is_solution(puzzle, solution)
+        total += best
+        print(f"{name:<20}{best * 1000:>10.2f}{'yes' if ok else 'NO':>5}")
+    print(f"{'total':<20}{total * 1000:>10.2f}")
+
+
+def bench_generate(count=50):
+    rng = random.Random(0)
+    print(f"{'difficulty':<20}{'mean ms':>10}{'max ms':>10}  grades")
+    for difficulty in DIFFICULTIES:
+        times = []
+        grades = {}
+        for _ in range(count):
+            start = time.perf_counter()
+            _, _, grade = generate_puzzle(difficulty, rng)
+            times.append(time.perf_counter() - start)
+            grades[grade] = grades.get(grade, 0) + 1
+        mean = sum(times) / len(times)
+        print(f"{difficulty:<20}{mean * 1000:>10.2f}{max(times) * 1000:>10.2f}  {grades}")
+
+
+def bench_large(count=5):
+    rng = random.Random(0)
+    print(f"{'board':<20}{'gen ms':>10}{'solve ms':>10}{'max ms':>10}")
+    for box in (4, 5):
+        gen_times = []
+        solve_times = []
+        for _ in range(count):
+            start = time.perf_counter()
+            puzzle, solution, _ = generate_puzzle("Medium", rng, box)
+            gen_times.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            assert solve_cells(puzzle) == solution
+            solve_times.append(time.perf_counter() - start)
+        size = box * box
+        print(
+            f"{f'{size}x{size}':<20}{sum(gen_times) / count * 1000:>10.2f}"
+            f"{sum(solve_times) / count * 1000:>10.2f}{max(solve_times) * 1000:>10.2f}"
+        )
+
+
+def sparse_puzzle(rng, box, blank):
+    """Blank a random fraction of a full grid, with no regard for uniqueness."""
+    solution = random_full_grid(rng, box)
+    puzzle = solution[:]
+    order = list(range(len(puzzle)))
+    rng.shuffle(order)
+    for i in order[:int(len(puzzle) * blank)]:
+        puzzle[i] = 0
+    return puzzle
+
+
+def bench_sparse(count=8):
+    print(f"{'board':<20}{'mean ms':>10}{'max ms':>10}{'ok':>5}")
+    for box, blank in ((4, 0.6), (4, 0.7), (5, 0.5), (5, 0.55), (5, 0.65)):
+        rng = random.Random(0)
+        times = []
+        ok = True
+        for _ in range(count):
+            puzzle = sparse_puzzle(rng, box, blank)
+            start = time.perf_counter()
+            solution = solve_cells(puzzle)
+            times.append(time.perf_counter() - start)
+            ok = ok and solution is not None and is_solution(puzzle, solution)
+        size = box * box
+        label = f"{size}x{size} {int(blank * 100)}% blank"
+        print(f"{label:<20}{sum(times) / count * 1000:>10.2f}{max(times) * 1000:>10.2f}{'yes' if ok else 'NO':>5}")
+
+
+if __name__ == "__main__":
+    main()
+    print()
+    bench_generate()
+    print()
+    bench_large()
+    print()
+    bench_sparse()
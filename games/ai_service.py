@@ -0,0 +1,83 @@
+# games/ai_service.py
+#
+# Shared background executor for AI turns. A render function hands the
+# service a search function and a private copy of the position, keeps the
+# returned future in session state, and polls it on later reruns, showing a
+# "thinking" state instead of holding the Streamlit script thread for the
+# length of the search. One executor serves the AI moves of every session;
+# long jobs that are not moves, like solution counts, run on executors of
+# their own (see EXECUTORS) so they never hold up an AI turn.
+#
+# A request is superseded when the game is reset or a newer request is
+# made for the same game. Cancelling a queued request drops it; a search
+# that has already started is told to stop through the threading.Event it
+# was handed as its stop argument, and gives up at its next time check.
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_WORKERS = min(4, os.cpu_count() or 1)
+# Threads of each named executor.
+EXECUTORS = {'ai': MAX_WORKERS, 'count': 2}
+# How often a waiting page checks whether the AI has moved, in seconds.
+POLL_SECONDS = 0.2
+
+_executors = {}
+_executor_lock = threading.Lock()
+
+
+def get_executor(name='ai'):
+    """Return the shared executor called name, starting it on first use."""
+    with _executor_lock:
+        if name not in _executors:
+            _executors[name] = ThreadPoolExecutor(max_workers=EXECUTORS[name], thread_name_prefix=f"gamehub-{name}")
+        return _executors[name]
+
+
+def process_context():
+    """Multiprocessing context for process pools started inside the server.
+
+    The Streamlit server is multi-threaded, and forking a threaded process
+    can leave a child holding a lock that is never released, so pools use
+    a fork server where the platform has one and fresh interpreters elsewhere.
+    """
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
+
+
+def request_move(state, key, fn, *args, executor='ai', **kwargs):
+    """Start fn(*args, stop=event, **kwargs) on the named executor and keep its future in state[key].
+
+    fn must accept a stop keyword: a threading.Event that is set once the
+    request is superseded, which a long search should check and give up on.
+    Any request already held in state[key] is cancelled first.
+    """
+    cancel_move(state, key)
+    stop = threading.Event()
+    future = get_executor(executor).submit(fn, *args, stop=stop, **kwargs)
+    future.stop = stop
+    state[key] = future
+    return future
+
+
+def cancel_move(state, key):
+    future = state.get(key)
+    if future is not None:
+        future.cancel()
+        future.stop.set()
+    state[key] = None
+
+
+def take_result(state, key):
+    """Return (True, result) once the request in state[key] has finished, else (False, None).
+
+    A finished request is removed from state, so its result is taken once.
+    Exceptions raised by the search are re-raised here.
+    """
+    future = state.get(key)
+    if future is None or not future.done():
+        return False, None
+    state[key] = None
+    return True, future.result()
@@ -2,6 +2,20 @@ import streamlit as st
 import random
 import time
 from utils import display_game_time
+from leaderboard import update_leaderboard
+from games.connect4_engine import Bitboard
+from games.connect4_ai import TranspositionTable, choose_move
+from games.connect4_book import book_move
+from games.connect4_parallel import choose_move_parallel
+from games.ai_service import POLL_SECONDS, cancel_move, request_move, take_result
+
+# Per-move time budget in seconds, search depth cap, and whether the AI may
+# play from the opening book, for each AI level.
+AI_LEVELS = {
+    "Easy": (0.05, 2, False),
+    "Medium": (0.2, 8, True),
+    "Hard": (1.0, 42, True),
+}
 
 def display_connect4_board(board):
     symbol_map = {
@@ -20,13 +34,29 @@ def render_connect4():
 
     mode = st.radio("Mode", ["Human vs Human", "Human vs AI"])
     game_state = st.session_state.games['connect4']
+    if mode == "Human vs AI":
+        levels = list(AI_LEVELS)
+        game_state['difficulty'] = st.radio(
+            "AI difficulty", levels,
+            index=levels.index(game_state.get('difficulty', 'Medium')),
+            horizontal=True,
+        )
+        game_state['parallel'] = st.checkbox(
+            "Search on all CPU cores", value=game_state.get('parallel', False),
+        )
 
     if st.button("Reset Game"):
+        cancel_move(game_state, 'ai_future')
         game_state['board'] = [[0 for _ in range(7)] for _ in range(6)]
+        game_state['bitboard'] = Bitboard()
         game_state['current_player'] = 1
         game_state['winner'] = None
+        game_state['ai_info'] = None
+        game_state['tt'] = None
         st.session_state.game_start_time = time.time()
-        st.experimental_rerun()
+        st.rerun()
+
+    bitboard = get_bitboard(game_state)
 
     # Display board
     st.write("Current Board:")
@@ -34,124 +64,117 @@ def render_connect4():
 
     if game_state['winner']:
         st.success(f"Player {game_state['winner']} wins!")
-        update_leaderboard('connect4', game_state['winner'])
-    elif check_draw(game_state['board']):
+    elif check_draw(bitboard):
         st.info("It's a draw!")
     else:
         st.write(f"Current player: {'Red (🔴)' if game_state['current_player'] == 1 else 'Yellow (🟡)'}")
+        ai_turn = mode == "Human vs AI" and game_state['current_player'] == 2
 
         # Column buttons
         cols = st.columns(7)
         for col in range(7):
             with cols[col]:
-                if st.button(f"↓", key=f"c4_col_{col}", disabled=game_state['winner'] is not None):
+                if st.button(f"↓", key=f"c4_col_{col}", disabled=game_state['winner'] is not None or ai_turn):
                     if make_connect4_move(game_state, col):
-                        if check_connect4_win(game_state['board'], game_state['current_player']):
+                        if check_connect4_win(bitboard, game_state['current_player']):
                             game_state['winner'] = game_state['current_player']
-                        elif check_draw(game_state['board']):
+                            # Only a win over the AI is credited, once, to the named player
+                            if mode == "Human vs AI":
+                                update_leaderboard('connect4', st.session_state.player_name)
+                        elif check_draw(bitboard):
                             pass  # Handled above
                         else:
                             game_state['current_player'] = 3 - game_state['current_player']
 
                             # AI Move if needed
                             if mode == "Human vs AI" and game_state['current_player'] == 2:
-                                ai_move_connect4(game_state)
-                                if check_connect4_win(game_state['board'], 2):
-                                    game_state['winner'] = 2
-                                elif check_draw(game_state['board']):
-                                    pass
-                                else:
-                                    game_state['current_player'] = 1
-                        st.experimental_rerun()
+                                request_ai_move(game_state)
+                        st.rerun()
+
+        if ai_turn:
+            if game_state.get('ai_future') is None:
+                request_ai_move(game_state)
+            poll_ai_move(game_state)
+        elif game_state.get('ai_future') is not None:
+            cancel_move(game_state, 'ai_future')
+
+    if mode == "Human vs AI" and game_state.get('ai_info'):
+        info = game_state['ai_info']
+        if info.get('book'):
+            st.caption("AI played its last move from the opening book")
+        else:
+            st.caption(
+                f"AI searched {info['nodes']:,} positions to depth {info['depth']} in {info['seconds'] * 1000:.0f} ms "
+                f"(transposition table hit rate {info['tt_hit_rate']:.0%})"
+            )
+            if info.get('workers'):
+                st.caption(f"Parallel search: {info['workers']} worker processes, {info['nps']:,.0f} positions/s")
 
     display_game_time()
 
+def get_bitboard(game_state):
+    """Return the game's bitboard, rebuilding it from the list board if needed."""
+    bitboard = game_state.get('bitboard')
+    if bitboard is None or bitboard.to_rows() != game_state['board']:
+        bitboard = game_state['bitboard'] = Bitboard.from_rows(game_state['board'])
+    return bitboard
+
+def _as_bitboard(board):
+    return board if isinstance(board, Bitboard) else Bitboard.from_rows(board)
+
 def make_connect4_move(game_state, col):
-    board = game_state['board']
-    for row in range(5, -1, -1):
-        if board[row][col] == 0:
-            board[row][col] = game_state['current_player']
-            return True
-    return False
+    bitboard = game_state.get('bitboard')
+    if bitboard is None:
+        bitboard = get_bitboard(game_state)
+    if not bitboard.can_play(col):
+        return False
+    player = game_state['current_player']
+    row = bitboard.play(col, player)
+    game_state['board'][row][col] = player
+    return True
 
 def check_connect4_win(board, player):
-    # Horizontal
-    for row in range(6):
-        for col in range(4):
-            if all(board[row][col+i] == player for i in range(4)):
-                return True
-    # Vertical
-    for row in range(3):
-        for col in range(7):
-            if all(board[row+i][col] == player for i in range(4)):
-                return True
-    # Diagonal (\)
-    for row in range(3):
-        for col in range(4):
-            if all(board[row+i][col+i] == player for i in range(4)):
-                return True
-    # Diagonal (/)
-    for row in range(3, 6):
-        for col in range(4):
-            if all(board[row-i][col+i] == player for i in range(4)):
-                return True
-    return False
+    return _as_bitboard(board).is_win(player)
 
 def check_draw(board):
-    return all(board[0][col] != 0 for col in range(7))
-
-def ai_move_connect4(game_state):
-    board = game_state['board']
-    best_score = -float('inf')
-    best_col = None
-
-    for col in range(7):
-        if all(board[row][col] != 0 for row in range(6)):
-            continue
-        for row in range(5, -1, -1):
-            if board[row][col] == 0:
-                board[row][col] = 2
-                score = minimax_connect4(board, 3, False)
-                board[row][col] = 0
-                if score > best_score:
-                    best_score = score
-                    best_col = col
-                break
-
-    if best_col is not None:
-        make_connect4_move(game_state, best_col)
-
-def minimax_connect4(board, depth, is_maximizing):
-    if check_connect4_win(board, 2):
-        return 10
-    if check_connect4_win(board, 1):
-        return -10
-    if depth == 0 or all(board[0][col] != 0 for col in range(7)):
-        return 0
-
-    if is_maximizing:
-        best_score = -float('inf')
-        for col in range(7):
-            if all(board[row][col] != 0 for row in range(6)):
-                continue
-            for row in range(5, -1, -1):
-                if board[row][col] == 0:
-                    board[row][col] = 2
-                    score = minimax_connect4(board, depth - 1, False)
-                    board[row][col] = 0
-                    best_score = max(best_score, score)
-                    break
-        return best_score
-    else:
-        best_score = float('inf')
-        for col in range(7):
-            if all(board[row][col] != 0 for row in range(6)):
-                continue
-            for row in range(5, -1, -1):
-                if board[row][col] == 0:
-                    board[row][col] = 1
-                    score = minimax_connect4(board, depth - 1, True)
-                    board[row][col] = 0
-                    best_score = min(best_score, score)
-                    break
-        return best_score
+    return _as_bitboard(board).is_full()
+
+def find_ai_move(bitboard, difficulty="Medium", table=None, parallel=False, stop=None):
+    """Return (col, info) for player 2. Safe to run off the script thread on a private bitboard."""
+    time_budget, max_depth, use_book = AI_LEVELS[difficulty]
+    entry = book_move(bitboard) if use_book else None
+    if entry is not None:
+        return entry[0], {'book': True, 'score': entry[1]}
+    search = choose_move_parallel if parallel else choose_move
+    return search(bitboard, 2, time_budget, max_depth, table, stop=stop)
+
+def request_ai_move(game_state):
+    """Start the AI's search in the background; render_connect4 polls for the result."""
+    # A cancelled search can still be writing to the table until it notices,
+    # so a new search only reuses the table once the last one has finished.
+    owner = game_state.get('tt_owner')
+    if game_state.get('tt') is None or (owner is not None and not owner.done()):
+        game_state['tt'] = TranspositionTable()
+    game_state['tt_owner'] = request_move(
+        game_state, 'ai_future', find_ai_move,
+        get_bitboard(game_state).copy(), game_state.get('difficulty', 'Medium'),
+        game_state['tt'], game_state.get('parallel', False),
+    )
+
+def apply_ai_move(game_state, col, info):
+    game_state['ai_info'] = info
+    if col is None or not make_connect4_move(game_state, col):
+        return
+    bitboard = get_bitboard(game_state)
+    if check_connect4_win(bitboard, 2):
+        game_state['winner'] = 2
+    elif not check_draw(bitboard):
+        game_state['current_player'] = 1
+
+@st.fragment(run_every=POLL_SECONDS)
+def poll_ai_move(game_state):
+    done, result = take_result(game_state, 'ai_future')
+    if done:
+        apply_ai_move(game_state, *result)
+        st.rerun()
+    st.info("AI is thinking…")
@@ -0,0 +1,283 @@
+# games/connect4_ai.py
+#
+# Connect 4 opponent: negamax with alpha-beta pruning over the bitboard in
+# games/connect4_engine.py, center-first move ordering, a window-count
+# evaluation at the horizon, iterative deepening against a per-move time
+# budget, and a transposition table that can be kept for a whole game.
+
+import time
+from array import array
+
+from games.connect4_engine import COLUMNS, HEIGHT, ROWS
+
+MOVE_ORDER = (3, 2, 4, 1, 5, 0, 6)
+WIN_SCORE = 100000
+CHECK_EVERY = 1024
+
+# Every line of four cells on the board, as a bitmask.
+WINDOWS = []
+for _col in range(COLUMNS):
+    for _row in range(ROWS):
+        for _dc, _dr in ((1, 0), (0, 1), (1, 1), (1, -1)):
+            _end_col, _end_row = _col + 3 * _dc, _row + 3 * _dr
+            if 0 <= _end_col < COLUMNS and 0 <= _end_row < ROWS:
+                WINDOWS.append(sum(1 << ((_col + k * _dc) * HEIGHT + _row + k * _dr) for k in range(4)))
+
+COLUMN_KEY_MASKS = [((1 << HEIGHT) - 1) << (col * HEIGHT) for col in range(COLUMNS)]
+CENTER_MASK = ((1 << ROWS) - 1) << (3 * HEIGHT)
+# Score for a window holding n discs of one side and none of the other.
+WINDOW_SCORES = (0, 1, 4, 32, 0)
+
+
+EXACT, LOWER, UPPER = 0, 1, 2
+# Bytes per table slot: key (8), score (4), depth, bound, move and age (1 each).
+ENTRY_BYTES = 16
+
+
+def position_key(bitboard):
+    """Unique integer for a position: player 1's discs plus the occupancy mask.
+
+    The mask fills each column from the bottom, so adding player 1's discs
+    to it can never collide with another position.
+    """
+    return bitboard.boards[0] + bitboard.mask
+
+
+def mirror_key(key):
+    """The key of the left-right mirrored position."""
+    return (
+        ((key & COLUMN_KEY_MASKS[0]) << 42)
+        | ((key & COLUMN_KEY_MASKS[1]) << 28)
+        | ((key & COLUMN_KEY_MASKS[2]) << 14)
+        | (key & COLUMN_KEY_MASKS[3])
+        | ((key >> 14) & COLUMN_KEY_MASKS[2])
+        | ((key >> 28) & COLUMN_KEY_MASKS[1])
+        | ((key >> 42) & COLUMN_KEY_MASKS[0])
+    )
+
+
+def canonical_key(bitboard):
+    """Return (key, flipped) for the smaller of a position and its mirror."""
+    key = position_key(bitboard)
+    mirrored = mirror_key(key)
+    return (mirrored, True) if mirrored < key else (key, False)
+
+
+class TranspositionTable:
+    """Fixed-size table of search results keyed by canonical position.
+
+    A position and its mirror image share one entry: keys are normalized to
+    the smaller of the two and best moves are stored in that orientation.
+    Slots live in flat arrays sized from max_bytes, so the table never grows.
+    Callers pass the (key, flipped) pair from canonical_key().
+    A slot is overwritten when it holds a result from an older move of the
+    game or one searched no deeper than the new result.
+    """
+
+    def __init__(self, max_bytes=4 * 1024 * 1024):
+        self.size = max(1, max_bytes // ENTRY_BYTES)
+        self.keys = array('q', [-1]) * self.size
+        self.scores = array('i', [0]) * self.size
+        self.depths = array('b', [0]) * self.size
+        self.bounds = array('b', [0]) * self.size
+        self.moves = array('b', [-1]) * self.size
+        self.ages = array('B', [0]) * self.size
+        self.age = 0
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    def new_search(self):
+        self.age = (self.age + 1) % 256
+
+    def probe(self, key, flipped):
+        """Return (depth, bound, score, best_col) for a canonical key, or None."""
+        self.probes += 1
+        slot = key % self.size
+        if self.keys[slot] != key:
+            return None
+        self.hits += 1
+        move = self.moves[slot]
+        if flipped and move >= 0:
+            move = COLUMNS - 1 - move
+        return self.depths[slot], self.bounds[slot], self.scores[slot], move
+
+    def store(self, key, flipped, depth, bound, score, best_col):
+        slot = key % self.size
+        if self.keys[slot] != -1 and self.ages[slot] == self.age and self.depths[slot] > depth:
+            return
+        if flipped and best_col >= 0:
+            best_col = COLUMNS - 1 - best_col
+        self.keys[slot] = key
+        self.scores[slot] = score
+        self.depths[slot] = depth
+        self.bounds[slot] = bound
+        self.moves[slot] = best_col
+        self.ages[slot] = self.age
+        self.stores += 1
+
+    @property
+    def hit_rate(self):
+        return self.hits / self.probes if self.probes else 0.0
+
+    @property
+    def nbytes(self):
+        return self.size * ENTRY_BYTES
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search once the move's time budget is spent."""
+
+
+def popcount(bits):
+    return bin(bits).count("1")
+
+
+def evaluate(bitboard, player):
+    """Heuristic score of a quiet position from player's point of view."""
+    own = bitboard.boards[player - 1]
+    other = bitboard.boards[2 - player]
+    score = 3 * (popcount(own & CENTER_MASK) - popcount(other & CENTER_MASK))
+    for window in WINDOWS:
+        mine = own & window
+        theirs = other & window
+        if mine and not theirs:
+            score += WINDOW_SCORES[popcount(mine)]
+        elif theirs and not mine:
+            score -= WINDOW_SCORES[popcount(theirs)]
+    return score
+
+
+class Search:
+    """One move's worth of iterative-deepening negamax."""
+
+    def __init__(self, bitboard, player, deadline, table=None, stop=None):
+        self.bitboard = bitboard
+        self.player = player
+        self.deadline = deadline
+        self.table = table
+        # Optional event (threading or multiprocessing) that ends the search early.
+        self.stop = stop
+        self.nodes = 0
+
+    def expired(self):
+        return (self.stop is not None and self.stop.is_set()) or time.perf_counter() > self.deadline
+
+    def negamax(self, depth, alpha, beta, player):
+        self.nodes += 1
+        if self.nodes % CHECK_EVERY == 0 and self.expired():
+            raise SearchTimeout
+        bitboard = self.bitboard
+        if bitboard.is_full():
+            return 0
+        if depth == 0:
+            return evaluate(bitboard, player)
+
+        table = self.table if depth >= 2 else None
+        order = MOVE_ORDER
+        original_alpha = alpha
+        if table is not None:
+            key, flipped = canonical_key(bitboard)
+            entry = table.probe(key, flipped)
+            if entry is not None:
+                entry_depth, bound, score, hash_move = entry
+                if entry_depth >= depth:
+                    if bound == EXACT:
+                        return score
+                    if bound == LOWER:
+                        alpha = max(alpha, score)
+                    else:
+                        beta = min(beta, score)
+                    if alpha >= beta:
+                        return score
+                if hash_move >= 0:
+                    order = (hash_move,) + tuple(col for col in MOVE_ORDER if col != hash_move)
+
+        best, best_col = -WIN_SCORE, -1
+        for col in order:
+            if not bitboard.can_play(col):
+                continue
+            bitboard.play(col, player)
+            if bitboard.is_win(player):
+                score = WIN_SCORE - bitboard.moves
+            else:
+                score = -self.negamax(depth - 1, -beta, -alpha, 3 - player)
+            bitboard.undo()
+            if score > best:
+                best, best_col = score, col
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if table is not None:
+            if best <= original_alpha:
+                bound = UPPER
+            elif best >= beta:
+                bound = LOWER
+            else:
+                bound = EXACT
+            table.store(key, flipped, depth, bound, best, best_col)
+        return best
+
+    def root(self, depth, order):
+        """Search every root move to depth and return (best_col, best_score)."""
+        bitboard = self.bitboard
+        alpha, beta = -WIN_SCORE, WIN_SCORE
+        best_col, best_score = order[0], -WIN_SCORE
+        for col in order:
+            bitboard.play(col, self.player)
+            if bitboard.is_win(self.player):
+                score = WIN_SCORE - bitboard.moves
+            else:
+                score = -self.negamax(depth - 1, -beta, -alpha, 3 - self.player)
+            bitboard.undo()
+            if score > best_score:
+                best_col, best_score = col, score
+                alpha = max(alpha, score)
+        return best_col, best_score
+
+
+def choose_move(bitboard, player, time_budget=0.2, max_depth=ROWS * COLUMNS, table=None, stop=None):
+    """Pick a column for player within roughly time_budget seconds.
+
+    Deepens one ply at a time, trying the previous iteration's best move
+    first, and returns the best move of the deepest completed iteration
+    along with a dict of search statistics. Pass the same table on every
+    move of a game to reuse results from earlier searches. Setting the
+    optional stop event ends the search as if its time had run out.
+    """
+    start = time.perf_counter()
+    bitboard = bitboard.copy()
+    if table is not None:
+        table.new_search()
+        probes, hits = table.probes, table.hits
+    search = Search(bitboard, player, start + time_budget, table, stop)
+    order = [col for col in MOVE_ORDER if bitboard.can_play(col)]
+    if not order:
+        return None, {'depth': 0, 'score': 0, 'nodes': 0, 'seconds': 0.0}
+
+    best_col, best_score, depth_done = order[0], 0, 0
+    remaining = ROWS * COLUMNS - bitboard.moves
+    for depth in range(1, min(max_depth, remaining) + 1):
+        try:
+            col, score = search.root(depth, order)
+        except SearchTimeout:
+            break
+        best_col, best_score, depth_done = col, score, depth
+        order.remove(col)
+        order.insert(0, col)
+        if abs(score) >= WIN_SCORE - ROWS * COLUMNS:
+            break
+
+    info = {
+        'depth': depth_done,
+        'score': best_score,
+        'nodes': search.nodes,
+        'seconds': time.perf_counter() - start,
+    }
+    if table is not None:
+        move_probes = table.probes - probes
+        info['tt_probes'] = move_probes
+        info['tt_hit_rate'] = (table.hits - hits) / move_probes if move_probes else 0.0
+    return best_col, info
@@ -0,0 +1,161 @@
+# games/connect4_book.py
+#
+# Precomputed opening book for the Connect 4 AI. The builder searches every
+# position up to a chosen number of plies (mirror images counted once) and
+# writes a compact binary file:
+#
+#     b"C4BK"  version:u8  plies:u8  depth:u8  pad:u8  count:u32
+#     count x key:u64      sorted canonical position keys
+#     count x entry:i32    score << 3 | best column
+#
+# At runtime the file is memory-mapped on the first lookup and probed with
+# a binary search over the key block, so early moves cost O(log n) reads
+# and app startup pays nothing.
+#
+#     python -m games.connect4_book --plies 4 --depth 8
+
+import argparse
+import mmap
+import os
+import struct
+import time
+
+from games.connect4_ai import MOVE_ORDER, Search, TranspositionTable, canonical_key
+from games.connect4_engine import COLUMNS, Bitboard
+
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "connect4_book.bin")
+MAGIC = b"C4BK"
+VERSION = 1
+HEADER = struct.Struct("<4sBBBxI")
+KEY = struct.Struct("<Q")
+ENTRY = struct.Struct("<i")
+
+
+class OpeningBook:
+    """Read-only view of a book file through a memory map."""
+
+    def __init__(self, path=BOOK_PATH):
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.plies, self.depth, self.count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} Connect 4 opening book")
+        self.keys_offset = HEADER.size
+        self.entries_offset = self.keys_offset + self.count * KEY.size
+
+    def __len__(self):
+        return self.count
+
+    def _find(self, key):
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            mid_key = KEY.unpack_from(self.data, self.keys_offset + mid * KEY.size)[0]
+            if mid_key < key:
+                lo = mid + 1
+            elif mid_key > key:
+                hi = mid
+            else:
+                return mid
+        return None
+
+    def lookup(self, bitboard):
+        """Return (best_col, score) for the position, or None if it is not in the book."""
+        key, flipped = canonical_key(bitboard)
+        index = self._find(key)
+        if index is None:
+            return None
+        entry = ENTRY.unpack_from(self.data, self.entries_offset + index * ENTRY.size)[0]
+        col, score = entry & 7, entry >> 3
+        return (COLUMNS - 1 - col if flipped else col), score
+
+
+_book = None
+_book_missing = False
+
+
+def get_book():
+    """Open the bundled book on first use; returns None if it is missing."""
+    global _book, _book_missing
+    if _book is None and not _book_missing:
+        try:
+            _book = OpeningBook()
+        except (OSError, ValueError):
+            _book_missing = True
+    return _book
+
+
+def book_move(bitboard):
+    book = get_book()
+    if book is None or bitboard.moves > book.plies:
+        return None
+    return book.lookup(bitboard)
+
+
+def iter_positions(plies):
+    """Yield (bitboard, player_to_move) for every undecided position up to plies deep.
+
+    Positions that are mirror images of one already yielded are skipped.
+    """
+    seen = set()
+    bitboard = Bitboard()
+
+    def walk(player):
+        key = canonical_key(bitboard)[0]
+        if key in seen:
+            return
+        seen.add(key)
+        yield bitboard, player
+        if bitboard.moves == plies:
+            return
+        for col in bitboard.legal_moves():
+            bitboard.play(col, player)
+            if not bitboard.is_win(player):
+                yield from walk(3 - player)
+            bitboard.undo()
+
+    yield from walk(1)
+
+
+def build_book(plies, depth, path=BOOK_PATH, verbose=True):
+    table = TranspositionTable(max_bytes=64 * 1024 * 1024)
+    records = []
+    start = time.perf_counter()
+    for bitboard, player in iter_positions(plies):
+        search = Search(bitboard.copy(), player, float("inf"), table)
+        order = [col for col in MOVE_ORDER if bitboard.can_play(col)]
+        for d in range(1, depth + 1):
+            col, score = search.root(d, order)
+            order.remove(col)
+            order.insert(0, col)
+        key, flipped = canonical_key(bitboard)
+        if flipped:
+            col = COLUMNS - 1 - col
+        records.append((key, score << 3 | col))
+        if verbose and len(records) % 100 == 0:
+            print(f"{len(records)} positions, {time.perf_counter() - start:.0f}s")
+
+    records.sort()
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, plies, depth, len(records)))
+        for key, _ in records:
+            f.write(KEY.pack(key))
+        for _, entry in records:
+            f.write(ENTRY.pack(entry))
+    if verbose:
+        size = os.path.getsize(path)
+        print(f"wrote {len(records)} positions ({size:,} bytes) to {path} in {time.perf_counter() - start:.0f}s")
+    return len(records)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the Connect 4 opening book.")
+    parser.add_argument("--plies", type=int, default=4, help="book every position up to this many discs")
+    parser.add_argument("--depth", type=int, default=8, help="search depth for each position")
+    parser.add_argument("--output", default=BOOK_PATH, help="where to write the book")
+    args = parser.parse_args(argv)
+    build_book(args.plies, args.depth, args.output)
+
+
+if __name__ == "__main__":
+    main()
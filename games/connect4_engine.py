@@ -0,0 +1,110 @@
+# games/connect4_engine.py
+#
+# Bitboard game core for games/connect4.py. Each player's discs live in one
+# integer, column by column with 7 bits per column (6 playable rows plus a
+# sentinel bit on top), bottom row first:
+#
+#      6 13 20 27 34 41 48   <- sentinel
+#      5 12 19 26 33 40 47
+#      4 11 18 25 32 39 46
+#      3 10 17 24 31 38 45
+#      2  9 16 23 30 37 44
+#      1  8 15 22 29 36 43
+#      0  7 14 21 28 35 42
+#
+# The sentinel row keeps shifted lines from wrapping into the next column,
+# so four in a row in any direction is two shifts and two ANDs.
+
+ROWS = 6
+COLUMNS = 7
+HEIGHT = ROWS + 1
+
+BOTTOM_MASK = sum(1 << (col * HEIGHT) for col in range(COLUMNS))
+BOARD_MASK = BOTTOM_MASK * ((1 << ROWS) - 1)
+TOP_MASKS = [1 << (col * HEIGHT + ROWS - 1) for col in range(COLUMNS)]
+COLUMN_MASKS = [((1 << ROWS) - 1) << (col * HEIGHT) for col in range(COLUMNS)]
+
+# Vertical, horizontal, and the two diagonals.
+DIRECTIONS = (1, HEIGHT, HEIGHT - 1, HEIGHT + 1)
+
+
+def has_four(bits):
+    for shift in DIRECTIONS:
+        pairs = bits & (bits >> shift)
+        if pairs & (pairs >> (2 * shift)):
+            return True
+    return False
+
+
+class Bitboard:
+    """Connect 4 position as two disc bitboards and a per-column height."""
+
+    def __init__(self):
+        self.boards = [0, 0]
+        self.heights = [col * HEIGHT for col in range(COLUMNS)]
+        self.history = []
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build a bitboard from the 6x7 list board, top row first."""
+        bitboard = cls()
+        for col in range(COLUMNS):
+            for row in range(ROWS - 1, -1, -1):
+                player = rows[row][col]
+                if player:
+                    bitboard.play(col, player)
+        return bitboard
+
+    def copy(self):
+        other = Bitboard()
+        other.boards = self.boards[:]
+        other.heights = self.heights[:]
+        other.history = self.history[:]
+        return other
+
+    def to_rows(self):
+        rows = [[0] * COLUMNS for _ in range(ROWS)]
+        for col in range(COLUMNS):
+            for row in range(ROWS):
+                bit = 1 << (col * HEIGHT + row)
+                if self.boards[0] & bit:
+                    rows[ROWS - 1 - row][col] = 1
+                elif self.boards[1] & bit:
+                    rows[ROWS - 1 - row][col] = 2
+        return rows
+
+    @property
+    def mask(self):
+        return self.boards[0] | self.boards[1]
+
+    @property
+    def moves(self):
+        return len(self.history)
+
+    def can_play(self, col):
+        return not self.mask & TOP_MASKS[col]
+
+    def play(self, col, player):
+        """Drop a disc for player (1 or 2) and return the row it landed in, top row first."""
+        bit_index = self.heights[col]
+        self.boards[player - 1] |= 1 << bit_index
+        self.heights[col] += 1
+        self.history.append(col)
+        return ROWS - 1 - (bit_index - col * HEIGHT)
+
+    def undo(self):
+        col = self.history.pop()
+        self.heights[col] -= 1
+        bit = ~(1 << self.heights[col])
+        self.boards[0] &= bit
+        self.boards[1] &= bit
+
+    def is_win(self, player):
+        return has_four(self.boards[player - 1])
+
+    def is_full(self):
+        return self.moves == ROWS * COLUMNS
+
+    def legal_moves(self):
+        mask = self.mask
+        return [col for col in range(COLUMNS) if not mask & TOP_MASKS[col]]
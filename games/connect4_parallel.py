@@ -0,0 +1,191 @@
+# games/connect4_parallel.py
+#
+# Optional multi-core mode for the Connect 4 AI. Each iteration of the
+# deepening loop searches the eldest root move (the previous iteration's
+# best) first, then farms the younger brothers out to a process pool with
+# the bound the eldest established ("young brothers wait"). Workers publish
+# improved bounds through shared memory so siblings started later prune
+# harder, and a shared stop flag cancels the whole iteration when the time
+# budget runs out.
+
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+from games.connect4_ai import MOVE_ORDER, WIN_SCORE, Search, SearchTimeout, TranspositionTable
+from games.connect4_engine import COLUMNS, ROWS, Bitboard
+from games.ai_service import process_context
+
+# How often the coordinator checks the caller's stop event while workers search.
+STOP_CHECK_SECONDS = 0.05
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+_search_lock = threading.Lock()
+_shared_alpha = None
+_stop = None
+
+# Worker-process state, set up by _init_worker.
+_worker_alpha = None
+_worker_stop = None
+_worker_table = None
+
+
+def _init_worker(alpha, stop):
+    global _worker_alpha, _worker_stop, _worker_table
+    _worker_alpha = alpha
+    _worker_stop = stop
+    _worker_table = TranspositionTable()
+
+
+def _search_child(state, col, player, depth, beta, time_left):
+    """Worker task: score one root move from the root player's point of view.
+
+    Returns (col, score, nodes, seconds), with score None if the search was
+    cancelled before it finished.
+    """
+    start = time.perf_counter()
+    bitboard = Bitboard()
+    bitboard.boards, bitboard.heights, bitboard.history = state
+    # The search also gives up when the coordinator raises the shared stop flag
+    search = Search(bitboard, player, start + time_left, _worker_table, _worker_stop)
+    with _worker_alpha.get_lock():
+        alpha = _worker_alpha.value
+    try:
+        bitboard.play(col, player)
+        if bitboard.is_win(player):
+            score = WIN_SCORE - bitboard.moves
+        else:
+            score = -search.negamax(depth - 1, -beta, -alpha, 3 - player)
+    except SearchTimeout:
+        return col, None, search.nodes, time.perf_counter() - start
+    with _worker_alpha.get_lock():
+        if score > _worker_alpha.value:
+            _worker_alpha.value = score
+    return col, score, search.nodes, time.perf_counter() - start
+
+
+def get_pool(workers=None):
+    """Return (pool, workers) for the shared worker pool, starting it on first use.
+
+    Asking for a different number of workers than the running pool has
+    replaces the pool.
+    """
+    global _pool, _pool_workers, _shared_alpha, _stop
+    with _pool_lock:
+        if _pool is not None and workers and workers != _pool_workers:
+            _shutdown_locked()
+        if _pool is None:
+            context = process_context()
+            _pool_workers = workers or os.cpu_count() or 1
+            _shared_alpha = context.Value('i', -WIN_SCORE)
+            _stop = context.Event()
+            _pool = ProcessPoolExecutor(
+                max_workers=_pool_workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(_shared_alpha, _stop),
+            )
+        return _pool, _pool_workers
+
+
+def _shutdown_locked():
+    global _pool, _pool_workers
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+        _pool_workers = 0
+
+
+def shutdown_pool():
+    with _pool_lock:
+        _shutdown_locked()
+
+
+def choose_move_parallel(bitboard, player, time_budget=0.2, max_depth=ROWS * COLUMNS, table=None, workers=None,
+                         stop=None):
+    """Parallel counterpart of connect4_ai.choose_move.
+
+    Returns (best_col, info) like choose_move, where info also reports the
+    worker count, total nodes across processes and nodes per second.
+    Setting the optional stop event ends the search as if its time had run out.
+    """
+    start = time.perf_counter()
+    deadline = start + time_budget
+    with _search_lock:
+        # Taken under the search lock so no other search can replace the pool mid-move
+        pool, pool_workers = get_pool(workers)
+        root = bitboard.copy()
+        if table is not None:
+            table.new_search()
+            probes, hits = table.probes, table.hits
+        eldest_search = Search(root, player, deadline, table, stop)
+        order = [col for col in MOVE_ORDER if root.can_play(col)]
+        if not order:
+            return None, {'depth': 0, 'score': 0, 'nodes': 0, 'seconds': 0.0, 'nps': 0.0, 'workers': 0}
+
+        best_col, best_score, depth_done = order[0], 0, 0
+        worker_nodes = 0
+        worker_seconds = 0.0
+        state = (root.boards[:], root.heights[:], root.history[:])
+        remaining = ROWS * COLUMNS - root.moves
+        for depth in range(1, min(max_depth, remaining) + 1):
+            eldest = order[0]
+            try:
+                root.play(eldest, player)
+                if root.is_win(player):
+                    eldest_score = WIN_SCORE - root.moves
+                else:
+                    eldest_score = -eldest_search.negamax(depth - 1, -WIN_SCORE, WIN_SCORE, 3 - player)
+                root.undo()
+            except SearchTimeout:
+                break
+
+            scores = {eldest: eldest_score}
+            _stop.clear()
+            with _shared_alpha.get_lock():
+                _shared_alpha.value = eldest_score
+            futures = [
+                pool.submit(_search_child, state, col, player, depth, WIN_SCORE, deadline - time.perf_counter())
+                for col in order[1:]
+            ]
+            pending = futures
+            while pending and not eldest_search.expired():
+                time_left = deadline - time.perf_counter()
+                _, pending = wait(pending, timeout=min(STOP_CHECK_SECONDS, max(0.0, time_left)))
+            if pending:
+                _stop.set()
+                wait(pending)
+            for future in futures:
+                col, score, nodes, seconds = future.result()
+                worker_nodes += nodes
+                worker_seconds += seconds
+                scores[col] = score
+            if any(score is None for score in scores.values()):
+                break
+
+            col = max(order, key=lambda c: (scores[c], -order.index(c)))
+            best_col, best_score, depth_done = col, scores[col], depth
+            order.remove(col)
+            order.insert(0, col)
+            if abs(best_score) >= WIN_SCORE - ROWS * COLUMNS:
+                break
+
+    elapsed = time.perf_counter() - start
+    nodes = eldest_search.nodes + worker_nodes
+    info = {
+        'depth': depth_done,
+        'score': best_score,
+        'nodes': nodes,
+        'seconds': elapsed,
+        'nps': nodes / elapsed if elapsed else 0.0,
+        'workers': pool_workers,
+        'worker_seconds': worker_seconds,
+    }
+    if table is not None:
+        move_probes = table.probes - probes
+        info['tt_probes'] = move_probes
+        info['tt_hit_rate'] = (table.hits - hits) / move_probes if move_probes else 0.0
+    return best_col, info
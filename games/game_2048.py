@@ -2,6 +2,21 @@ import streamlit as st
 import random
 import time
 
+from leaderboard import update_leaderboard
+from games.game_2048_engine import DIRECTIONS, SIZE, can_move, decode, encode, move, spawn
+from games.game_2048_sim import from_grid, legal_moves, move_boards, to_grid
+from games.game_2048_replay import ReplayRandom, encode_replay, new_seed, spawn_tile
+from games.game_2048_ai import choose_move
+from games.ai_service import POLL_SECONDS
+
+# Per-move search budget for the hint and autoplay, and how long one autoplay
+# refresh may keep playing before the board is redrawn.
+AI_TIME_BUDGET = 0.05
+AUTOPLAY_BATCH_SECONDS = 0.5
+ARROWS = {'up': "↑", 'down': "↓", 'left': "←", 'right': "→"}
+BOARD_SIZES = range(3, 9)
+BOARD_PIXELS = 360
+
 def render_2048():
     st.title("2048")
     
@@ -10,159 +25,164 @@ def render_2048():
     
     game_state = st.session_state.games['2048']
     
-    if st.button("New Game"):
-        game_state['board'] = initialize_2048()
-        game_state['score'] = 0
-        game_state['game_over'] = False
-        st.session_state.game_start_time = time.time()
-        st.experimental_rerun()
+    if '2048_size' not in st.session_state:
+        st.session_state['2048_size'] = game_state.get('size', SIZE)
+    size = st.selectbox("Board size", BOARD_SIZES, key='2048_size', format_func=lambda n: f"{n}×{n}")
+    if size != game_state.get('size', SIZE):
+        new_game_2048(game_state, size)
+    
+    if st.button("New Game") or 'seed' not in game_state:
+        # Games are seeded from the start so they can be replayed
+        new_game_2048(game_state, size)
+        st.rerun()
+    
+    if game_state.get('autoplay_left'):
+        autoplay_2048()
+        return
     
     st.write(f"Score: {game_state['score']}")
     display_2048_board(game_state['board'])
     
     if game_state['game_over']:
         st.error("Game Over!")
-        update_leaderboard('2048', st.session_state.player_name, score=game_state['score'])
+        # Verified and ranked once per game, not on every rerun of this screen.
+        # Only unassisted games on the standard board are ranked.
+        if game_state.get('ranked') is None:
+            game_state['ranked'] = False
+            if not game_state.get('assisted') and size == SIZE:
+                replay = encode_replay(size, game_state['seed'], game_state['score'], game_state['moves'])
+                game_state['ranked'] = update_leaderboard('2048', st.session_state.player_name, game_state['score'], replay=replay)
         if st.button("Play Again"):
-            game_state['board'] = initialize_2048()
-            game_state['score'] = 0
-            game_state['game_over'] = False
-            st.session_state.game_start_time = time.time()
-            st.experimental_rerun()
+            new_game_2048(game_state, size)
+            st.rerun()
     else:
         # Movement controls
         col1, col2, col3, col4 = st.columns(4)
         with col2:
-            if st.button("↑", key="2048_up"):
-                move_2048(game_state, 'up')
+            st.button("↑", key="2048_up", on_click=move_2048, args=(game_state, 'up'))
         with col1:
-            if st.button("←", key="2048_left"):
-                move_2048(game_state, 'left')
+            st.button("←", key="2048_left", on_click=move_2048, args=(game_state, 'left'))
         with col3:
-            if st.button("→", key="2048_right"):
-                move_2048(game_state, 'right')
+            st.button("→", key="2048_right", on_click=move_2048, args=(game_state, 'right'))
         with col4:
-            if st.button("↓", key="2048_down"):
-                move_2048(game_state, 'down')
+            st.button("↓", key="2048_down", on_click=move_2048, args=(game_state, 'down'))
+        
+        # AI help, which plays on the packed 4x4 board only
+        if size == SIZE:
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.button("Hint", key="2048_hint", on_click=show_hint, args=(game_state,))
+            with col2:
+                autoplay_moves = st.number_input("Moves", min_value=1, max_value=1000, value=50, key="2048_autoplay_moves")
+            with col3:
+                st.button("Autoplay", key="2048_autoplay", on_click=start_autoplay, args=(game_state, autoplay_moves))
+            if game_state.get('hint'):
+                direction, info = game_state['hint']
+                st.info(f"Hint: {ARROWS[direction]} {direction} (searched {info['depth']} moves ahead, {info['nodes']} positions)")
+        else:
+            st.caption("Hints, autoplay and the leaderboard use the standard 4×4 board.")
     
     display_game_time()
 
-def initialize_2048():
-    board = [[0 for _ in range(4)] for _ in range(4)]
-    add_random_tile(board)
-    add_random_tile(board)
+@st.fragment(run_every=POLL_SECONDS)
+def autoplay_2048():
+    """Play AI moves in batches, redrawing the board between them, until the count runs out."""
+    game_state = st.session_state.games['2048']
+    deadline = time.perf_counter() + AUTOPLAY_BATCH_SECONDS
+    while game_state['autoplay_left'] and not game_state['game_over'] and time.perf_counter() < deadline:
+        direction, _ = choose_move(encode(game_state['board']), AI_TIME_BUDGET)
+        if direction is None or not move_2048(game_state, direction):
+            game_state['autoplay_left'] = 0
+            break
+        game_state['autoplay_left'] -= 1
+    
+    if game_state['autoplay_left'] and not game_state['game_over']:
+        st.write(f"Score: {game_state['score']}")
+        display_2048_board(game_state['board'])
+        st.write(f"Autoplay: {game_state['autoplay_left']} moves left")
+        # The callback runs before the next batch, so Stop takes effect at once
+        st.button("Stop", key="2048_stop", on_click=stop_autoplay, args=(game_state,))
+        return
+    
+    # Done, game over, or stuck: back to the normal page
+    game_state['autoplay_left'] = 0
+    st.rerun()
+
+def new_game_2048(game_state, size=SIZE):
+    game_state['size'] = size
+    game_state['seed'] = new_seed()
+    game_state['rng'] = ReplayRandom(game_state['seed'])
+    game_state['moves'] = bytearray()
+    game_state['board'] = initialize_2048(size, game_state['rng'])
+    game_state['score'] = 0
+    game_state['game_over'] = False
+    game_state['assisted'] = False
+    game_state['ranked'] = None
+    game_state['hint'] = None
+    game_state['autoplay_left'] = 0
+    st.session_state.game_start_time = time.time()
+
+def show_hint(game_state):
+    # A board with a move left is never game over, so the search always finds one
+    game_state['hint'] = choose_move(encode(game_state['board']), AI_TIME_BUDGET)
+    game_state['assisted'] = True
+
+def start_autoplay(game_state, moves):
+    game_state['autoplay_left'] = int(moves)
+    game_state['assisted'] = True
+
+def stop_autoplay(game_state):
+    game_state['autoplay_left'] = 0
+
+def initialize_2048(size=SIZE, rng=random):
+    board = [[0 for _ in range(size)] for _ in range(size)]
+    add_random_tile(board, rng)
+    add_random_tile(board, rng)
     return board
 
-def add_random_tile(board):
-    empty_cells = [(i, j) for i in range(4) for j in range(4) if board[i][j] == 0]
-    if empty_cells:
-        i, j = random.choice(empty_cells)
-        board[i][j] = 2 if random.random() < 0.9 else 4
+def add_random_tile(board, rng=random):
+    if len(board) == SIZE:
+        board[:] = decode(spawn(encode(board), rng))
+    else:
+        spawn_tile(board, rng)
 
 def move_2048(game_state, direction):
     board = game_state['board']
-    moved = False
-    score = 0
-    
-    if direction == 'left':
-        for row in range(4):
-            # Remove zeros
-            non_zeros = [cell for cell in board[row] if cell != 0]
-            # Merge adjacent equal numbers
-            i = 0
-            while i < len(non_zeros) - 1:
-                if non_zeros[i] == non_zeros[i+1]:
-                    non_zeros[i] *= 2
-                    score += non_zeros[i]
-                    non_zeros.pop(i+1)
-                i += 1
-            # Pad with zeros
-            new_row = non_zeros + [0] * (4 - len(non_zeros))
-            if new_row != board[row]:
-                moved = True
-            board[row] = new_row
-    
-    elif direction == 'right':
-        for row in range(4):
-            non_zeros = [cell for cell in board[row] if cell != 0]
-            i = len(non_zeros) - 1
-            while i > 0:
-                if non_zeros[i] == non_zeros[i-1]:
-                    non_zeros[i] *= 2
-                    score += non_zeros[i]
-                    non_zeros.pop(i-1)
-                    i -= 1
-                i -= 1
-            new_row = [0] * (4 - len(non_zeros)) + non_zeros
-            if new_row != board[row]:
-                moved = True
-            board[row] = new_row
-    
-    elif direction == 'up':
-        for col in range(4):
-            column = [board[row][col] for row in range(4)]
-            non_zeros = [cell for cell in column if cell != 0]
-            i = 0
-            while i < len(non_zeros) - 1:
-                if non_zeros[i] == non_zeros[i+1]:
-                    non_zeros[i] *= 2
-                    score += non_zeros[i]
-                    non_zeros.pop(i+1)
-                i += 1
-            new_column = non_zeros + [0] * (4 - len(non_zeros))
-            for row in range(4):
-                if board[row][col] != new_column[row]:
-                    moved = True
-                board[row][col] = new_column[row]
-    
-    elif direction == 'down':
-        for col in range(4):
-            column = [board[row][col] for row in range(4)]
-            non_zeros = [cell for cell in column if cell != 0]
-            i = len(non_zeros) - 1
-            while i > 0:
-                if non_zeros[i] == non_zeros[i-1]:
-                    non_zeros[i] *= 2
-                    score += non_zeros[i]
-                    non_zeros.pop(i-1)
-                    i -= 1
-                i -= 1
-            new_column = [0] * (4 - len(non_zeros)) + non_zeros
-            for row in range(4):
-                if board[row][col] != new_column[row]:
-                    moved = True
-                board[row][col] = new_column[row]
+    rng = game_state.get('rng', random)
+    if len(board) == SIZE:
+        packed = encode(board)
+        moved_board, score = move(packed, direction)
+        moved = moved_board != packed
+        if moved:
+            moved_board = spawn(moved_board, rng)
+            board[:] = decode(moved_board)
+            game_over = not can_move(moved_board)
+    else:
+        # Any other size slides a one-board batch with the simulator's kernel
+        boards, points, changed = move_boards(from_grid(board), direction)
+        score, moved = int(points[0]), bool(changed[0])
+        if moved:
+            board[:] = to_grid(boards[0])
+            spawn_tile(board, rng)
+            game_over = check_2048_game_over(board)
     
     game_state['score'] += score
     
     if moved:
-        add_random_tile(board)
+        game_state['hint'] = None
+        if 'moves' in game_state:
+            game_state['moves'].append(DIRECTIONS.index(direction))
         
         # Check for game over
-        if check_2048_game_over(board):
+        if game_over:
             game_state['game_over'] = True
     
     return moved
 
 def check_2048_game_over(board):
-    # Check if there are any empty cells
-    for row in range(4):
-        for col in range(4):
-            if board[row][col] == 0:
-                return False
-    
-    # Check if there are any adjacent equal cells
-    for row in range(4):
-        for col in range(3):
-            if board[row][col] == board[row][col+1]:
-                return False
-    
-    for col in range(4):
-        for row in range(3):
-            if board[row][col] == board[row+1][col]:
-                return False
-    
-    return True
+    if len(board) == SIZE:
+        return not can_move(encode(board))
+    return not legal_moves(from_grid(board))[0].any()
 
 def display_2048_board(board):
     colors = {
@@ -180,15 +200,20 @@ def display_2048_board(board):
         2048: "#edc22e"
     }
     
-    html = "<div style='display: grid; grid-template-columns: repeat(4, 80px); gap: 10px; background-color: #bbada0; padding: 10px; border-radius: 5px;'>"
-    for row in range(4):
-        for col in range(4):
+    size = len(board)
+    # Cells shrink on bigger boards so the grid keeps roughly the same width
+    cell = min(80, BOARD_PIXELS // size)
+    scale = cell / 80
+    
+    html = f"<div style='display: grid; grid-template-columns: repeat({size}, {cell}px); gap: 10px; background-color: #bbada0; padding: 10px; border-radius: 5px; width: fit-content;'>"
+    for row in range(size):
+        for col in range(size):
             value = board[row][col]
             color = colors.get(value, "#000000")
             text_color = "#776e65" if value <= 4 else "#f9f6f2"
-            font_size = "24px" if value < 100 else "20px" if value < 1000 else "16px"
+            font_size = max(11, round((24 if value < 100 else 20 if value < 1000 else 16) * scale))
             text = str(value) if value != 0 else ""
-            html += f"<div style='width: 80px; height: 80px; background-color: {color}; color: {text_color}; display: flex; justify-content: center; align-items: center; font-weight: bold; font-size: {font_size};'>{text}</div>"
+            html += f"<div style='width: {cell}px; height: {cell}px; background-color: {color}; color: {text_color}; display: flex; justify-content: center; align-items: center; font-weight: bold; font-size: {font_size}px;'>{text}</div>"
     html += "</div>"
     st.markdown(html, unsafe_allow_html=True)
 
@@ -196,14 +221,3 @@ def display_game_time():
     if st.session_state.game_start_time:
         elapsed_time = int(time.time() - st.session_state.game_start_time)
         st.write(f"Time: {elapsed_time // 60}m {elapsed_time % 60}s")
-
-def update_leaderboard(game, player_name, score=1):
-    if player_name not in st.session_state.leaderboard[game]['wins']:
-        st.session_state.leaderboard[game]['wins'][player_name] = 0
-        st.session_state.leaderboard[game]['times'][player_name] = []
-    
-    st.session_state.leaderboard[game]['wins'][player_name] += score
-    
-    if st.session_state.game_start_time:
-        elapsed_time = int(time.time() - st.session_state.game_start_time)
-        st.session_state.leaderboard[game]['times'][player_name].append(elapsed_time)
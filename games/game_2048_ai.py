@@ -0,0 +1,174 @@
+# games/game_2048_ai.py
+#
+# Expectimax player for 2048 on the packed board of games/game_2048_engine.py.
+# Max nodes try the four slides; chance nodes average over every empty cell
+# receiving a 2 (90%) or a 4 (10%). Branches whose probability of being
+# reached drops below PROBABILITY_CUTOFF are scored by the heuristic instead
+# of being expanded, which prunes most of the rare 4-spawns early.
+#
+# The heuristic is summed over rows and columns from a table of 65,536
+# precomputed row scores (empty cells, mergeable neighbours, monotonicity),
+# and positions already scored at the same or a greater depth are reused
+# from a cache shared by one decision. Depth is raised one step at a time
+# against a per-move time budget, as in games/connect4_ai.py.
+
+import time
+from array import array
+from functools import lru_cache
+
+from games.game_2048_engine import (
+    DIRECTIONS, ROW_MASK, TWO_PROBABILITY, count_empty, move, row_tables, transpose,
+)
+
+PROBABILITY_CUTOFF = 0.0001
+FOUR_PROBABILITY = 1 - TWO_PROBABILITY
+CHECK_EVERY = 256
+
+LOST_PENALTY = 200000.0
+MONOTONICITY_POWER = 4.0
+MONOTONICITY_WEIGHT = 47.0
+SUM_POWER = 3.5
+SUM_WEIGHT = 11.0
+MERGES_WEIGHT = 700.0
+EMPTY_WEIGHT = 270.0
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search once the move's time budget is spent."""
+
+
+@lru_cache(maxsize=None)
+def row_heuristics():
+    """Heuristic score of every packed row, indexed like the engine's row tables."""
+    table = array('d', bytes(8 * (ROW_MASK + 1)))
+    for row in range(ROW_MASK + 1):
+        line = [(row >> (4 * c)) & 0xF for c in range(4)]
+        total = sum(rank ** SUM_POWER for rank in line)
+        empty = line.count(0)
+        merges = 0
+        previous = counter = 0
+        for rank in line:
+            if not rank:
+                continue
+            if rank == previous:
+                counter += 1
+            elif counter:
+                merges += 1 + counter
+                counter = 0
+            previous = rank
+        if counter:
+            merges += 1 + counter
+        # Penalize the row for going both up and down along its length.
+        rising = falling = 0.0
+        for a, b in zip(line, line[1:]):
+            if a > b:
+                rising += a ** MONOTONICITY_POWER - b ** MONOTONICITY_POWER
+            else:
+                falling += b ** MONOTONICITY_POWER - a ** MONOTONICITY_POWER
+        table[row] = (
+            LOST_PENALTY
+            + EMPTY_WEIGHT * empty
+            + MERGES_WEIGHT * merges
+            - MONOTONICITY_WEIGHT * min(rising, falling)
+            - SUM_WEIGHT * total
+        )
+    return table
+
+
+def evaluate(board):
+    """Heuristic score of a board: every row plus every column."""
+    table = row_heuristics()
+    columns = transpose(board)
+    return (
+        table[board & ROW_MASK] + table[(board >> 16) & ROW_MASK]
+        + table[(board >> 32) & ROW_MASK] + table[board >> 48]
+        + table[columns & ROW_MASK] + table[(columns >> 16) & ROW_MASK]
+        + table[(columns >> 32) & ROW_MASK] + table[columns >> 48]
+    )
+
+
+class Search:
+    """One decision's worth of iterative-deepening expectimax."""
+
+    def __init__(self, deadline):
+        self.deadline = deadline
+        self.cache = {}
+        self.nodes = 0
+        self.cache_hits = 0
+
+    def best_move(self, board, depth, probability):
+        """Value of the best slide from board (0 if no slide is possible)."""
+        best = 0.0
+        for direction in DIRECTIONS:
+            moved, _ = move(board, direction)
+            if moved != board:
+                best = max(best, self.chance(moved, depth - 1, probability))
+        return best
+
+    def chance(self, board, depth, probability):
+        """Expected value over the tiles that can appear after a slide."""
+        self.nodes += 1
+        if self.nodes % CHECK_EVERY == 0 and time.perf_counter() > self.deadline:
+            raise SearchTimeout
+        if depth <= 0 or probability < PROBABILITY_CUTOFF:
+            return evaluate(board)
+        cached = self.cache.get(board)
+        if cached is not None and cached[0] >= depth:
+            self.cache_hits += 1
+            return cached[1]
+
+        empty = count_empty(board)
+        share = probability / empty
+        total = 0.0
+        tile = 1
+        for shift in range(0, 64, 4):
+            if (board >> shift) & 0xF:
+                continue
+            total += TWO_PROBABILITY * self.best_move(board | (tile << shift), depth, share * TWO_PROBABILITY)
+            total += FOUR_PROBABILITY * self.best_move(board | ((tile + 1) << shift), depth, share * FOUR_PROBABILITY)
+        value = total / empty
+        self.cache[board] = (depth, value)
+        return value
+
+    def root(self, board, depth):
+        """Return (direction, value) of the best slide searched to depth."""
+        best_direction, best_value = None, -1.0
+        for direction in DIRECTIONS:
+            moved, _ = move(board, direction)
+            if moved == board:
+                continue
+            value = self.chance(moved, depth - 1, 1.0)
+            if value > best_value:
+                best_direction, best_value = direction, value
+        return best_direction, best_value
+
+
+def choose_move(board, time_budget=0.05, max_depth=6):
+    """Pick a direction for a packed board within roughly time_budget seconds.
+
+    Returns (direction, info) where info holds the completed depth, node
+    count, cache hits and elapsed seconds; direction is None when no slide
+    changes the board. Depth counts slides: depth 2 looks at the next tile
+    to appear and the slide after it.
+    """
+    # Tables are built once per process, outside the first move's budget
+    row_tables()
+    row_heuristics()
+    start = time.perf_counter()
+    search = Search(start + time_budget)
+    best_direction, depth_done = None, 0
+    for depth in range(1, max_depth + 1):
+        try:
+            direction, _ = search.root(board, depth)
+        except SearchTimeout:
+            break
+        best_direction, depth_done = direction, depth
+        if direction is None:
+            break
+
+    return best_direction, {
+        'depth': depth_done,
+        'nodes': search.nodes,
+        'cache_hits': search.cache_hits,
+        'seconds': time.perf_counter() - start,
+    }
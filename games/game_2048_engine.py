@@ -0,0 +1,170 @@
+# games/game_2048_engine.py
+#
+# Packed 4x4 board for games/game_2048.py. Each tile is stored as its
+# exponent (2 -> 1, 4 -> 2, ..., 32768 -> 15, 0 for empty) in 4 bits, so the
+# whole board is one 64-bit integer: row r is the 16 bits at 16 * r and
+# column c of that row is the nibble at 4 * c, with column 0 at the bottom.
+#
+# A move only ever changes rows independently, so the result of sliding any
+# 16-bit row left or right, and the points it scores, are looked up in
+# tables of 65,536 entries built once per process. Up and down transpose the
+# board, slide the rows, and transpose back.
+
+import random
+from array import array
+from functools import lru_cache
+
+SIZE = 4
+CELLS = SIZE * SIZE
+MAX_EXPONENT = 15
+# Chance that a new tile is a 2 rather than a 4.
+TWO_PROBABILITY = 0.9
+ROW_MASK = 0xFFFF
+DIRECTIONS = ('up', 'down', 'left', 'right')
+
+
+def _slide_left(exponents):
+    """Slide and merge one row of exponents toward column 0; returns (row, points)."""
+    tiles = [e for e in exponents if e]
+    merged = []
+    points = 0
+    i = 0
+    while i < len(tiles):
+        if i + 1 < len(tiles) and tiles[i] == tiles[i + 1] and tiles[i] < MAX_EXPONENT:
+            merged.append(tiles[i] + 1)
+            points += 1 << (tiles[i] + 1)
+            i += 2
+        else:
+            merged.append(tiles[i])
+            i += 1
+    return merged + [0] * (SIZE - len(merged)), points
+
+
+def _pack_row(exponents):
+    return sum(e << (4 * c) for c, e in enumerate(exponents))
+
+
+def _reverse_row(row):
+    return ((row & 0xF) << 12) | ((row & 0xF0) << 4) | ((row >> 4) & 0xF0) | (row >> 12)
+
+
+@lru_cache(maxsize=None)
+def row_tables():
+    """Return (left, right, score) tables indexed by a packed 16-bit row.
+
+    left[row] and right[row] are the row after sliding that way and
+    score[row] the points either slide earns (a row and its mirror image
+    merge the same pairs).
+    """
+    left = array('H', bytes(2 * (ROW_MASK + 1)))
+    right = array('H', bytes(2 * (ROW_MASK + 1)))
+    score = array('I', bytes(4 * (ROW_MASK + 1)))
+    for row in range(ROW_MASK + 1):
+        exponents = [(row >> (4 * c)) & 0xF for c in range(SIZE)]
+        slid, points = _slide_left(exponents)
+        left[row] = _pack_row(slid)
+        score[row] = points
+    for row in range(ROW_MASK + 1):
+        right[row] = _reverse_row(left[_reverse_row(row)])
+    return left, right, score
+
+
+def transpose(board):
+    """Swap rows and columns of a packed board (nibble (r, c) goes to (c, r))."""
+    a1 = board & 0xF0F00F0FF0F00F0F
+    a2 = board & 0x0000F0F00000F0F0
+    a3 = board & 0x0F0F00000F0F0000
+    a = a1 | (a2 << 12) | (a3 >> 12)
+    b1 = a & 0xFF00FF0000FF00FF
+    b2 = a & 0x00FF00FF00000000
+    b3 = a & 0x00000000FF00FF00
+    return b1 | (b2 >> 24) | (b3 << 24)
+
+
+def _slide_rows(board, table, score):
+    result = 0
+    points = 0
+    for shift in (0, 16, 32, 48):
+        row = (board >> shift) & ROW_MASK
+        result |= table[row] << shift
+        points += score[row]
+    return result, points
+
+
+def move(board, direction):
+    """Return (board, points) after sliding every tile in direction.
+
+    The board comes back unchanged when the move is not possible.
+    """
+    left, right, score = row_tables()
+    if direction == 'left':
+        return _slide_rows(board, left, score)
+    if direction == 'right':
+        return _slide_rows(board, right, score)
+    if direction not in ('up', 'down'):
+        raise ValueError(f"unknown direction {direction!r}")
+    moved, points = _slide_rows(transpose(board), left if direction == 'up' else right, score)
+    return transpose(moved), points
+
+
+def empty_cells(board):
+    """Indexes (4 * row + col) of the empty cells."""
+    return [i for i in range(CELLS) if not (board >> (4 * i)) & 0xF]
+
+
+def count_empty(board):
+    # Fold each nibble down to one bit that is set when the nibble is non-zero.
+    board |= (board >> 2) & 0x3333333333333333
+    board |= board >> 1
+    return CELLS - bin(board & 0x1111111111111111).count("1")
+
+
+def can_move(board):
+    """True while some slide still changes the board."""
+    left, right, _ = row_tables()
+    transposed = transpose(board)
+    for rows in (board, transposed):
+        for shift in (0, 16, 32, 48):
+            row = (rows >> shift) & ROW_MASK
+            if left[row] != row or right[row] != row:
+                return True
+    return False
+
+
+def spawn(board, rng=random):
+    """Put a 2 (90%) or a 4 (10%) on a random empty cell; a full board is returned as is."""
+    empty = empty_cells(board)
+    if not empty:
+        return board
+    cell = rng.choice(empty)
+    exponent = 1 if rng.random() < TWO_PROBABILITY else 2
+    return board | (exponent << (4 * cell))
+
+
+def max_exponent(board):
+    return max((board >> (4 * i)) & 0xF for i in range(CELLS))
+
+
+def encode(grid):
+    """Pack a 4x4 list of tile values (0, 2, 4, ...) into a board."""
+    board = 0
+    for r, row in enumerate(grid):
+        for c, value in enumerate(row):
+            if value:
+                exponent = value.bit_length() - 1
+                if exponent > MAX_EXPONENT or value != 1 << exponent:
+                    raise ValueError(f"tile {value} cannot be stored on a packed board")
+                board |= exponent << (4 * (SIZE * r + c))
+    return board
+
+
+def decode(board):
+    """Unpack a board into a 4x4 list of tile values."""
+    grid = []
+    for r in range(SIZE):
+        row = []
+        for c in range(SIZE):
+            exponent = (board >> (4 * (SIZE * r + c))) & 0xF
+            row.append(1 << exponent if exponent else 0)
+        grid.append(row)
+    return grid
@@ -0,0 +1,324 @@
+# games/game_2048_replay.py
+#
+# Replay logs for 2048. Every new tile of a game is drawn from a random
+# stream fixed by the game's seed, so the seed and the list of moves are
+# enough to play the game again and recompute its score. A log is an
+# 18-byte header (format version, board size, seed, claimed score, number
+# of moves) followed by the moves at 2 bits each, four to a byte, as
+# indexes into DIRECTIONS.
+#
+# The stream is counter based: draw number i of a game is splitmix64 of
+# (seed, i), so any draw can be computed without the ones before it and a
+# whole batch of games can draw at once. Each tile takes two draws, one
+# for the cell (among the empty cells in row-major order) and one for 2 or 4.
+#
+# verify_replays re-plays a batch of logs together. A 4x4 log is played on
+# the packed board of games/game_2048_engine.py, the board the page itself
+# plays: one log at a time through the engine's move() and spawn(), or a
+# whole batch as an array of packed boards slid through the engine's row
+# tables. Other sizes use the NumPy kernel of games/game_2048_sim.py:
+#
+#     python -m games.game_2048_replay replays.bin [more.bin ...]
+#
+# checks every log in the files (logs are self-delimiting and can be
+# concatenated) and reports how many are valid and how fast they were checked.
+
+import argparse
+import random
+import struct
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from games.game_2048_engine import DIRECTIONS, ROW_MASK, SIZE, TWO_PROBABILITY, move, row_tables, spawn, transpose
+from games.game_2048_sim import move_boards
+
+VERSION = 1
+HEADER = struct.Struct('<BBQII')
+MASK64 = (1 << 64) - 1
+GOLDEN = 0x9E3779B97F4A7C15
+MIX1 = 0xBF58476D1CE4E5B9
+MIX2 = 0x94D049BB133111EB
+NIBBLE_SHIFTS = np.arange(SIZE * SIZE, dtype=np.uint64) * np.uint64(4)
+
+
+def splitmix64(seed, counter):
+    z = (seed + (counter + 1) * GOLDEN) & MASK64
+    z = ((z ^ (z >> 30)) * MIX1) & MASK64
+    z = ((z ^ (z >> 27)) * MIX2) & MASK64
+    return z ^ (z >> 31)
+
+
+def _splitmix64_array(seeds, counters):
+    with np.errstate(over='ignore'):
+        z = seeds + (counters + np.uint64(1)) * np.uint64(GOLDEN)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(MIX1)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(MIX2)
+    return z ^ (z >> np.uint64(31))
+
+
+def new_seed():
+    return random.getrandbits(64)
+
+
+class ReplayRandom:
+    """The seeded stream behind a game's new tiles.
+
+    Provides the choice() and random() that games.game_2048_engine.spawn
+    uses, so it can be passed as spawn's rng.
+    """
+
+    def __init__(self, seed):
+        self.seed = seed
+        self.draws = 0
+
+    def _next(self):
+        value = splitmix64(self.seed, self.draws)
+        self.draws += 1
+        return value
+
+    def choice(self, seq):
+        return seq[((self._next() >> 32) * len(seq)) >> 32]
+
+    def random(self):
+        return (self._next() >> 11) * 2.0 ** -53
+
+
+def spawn_tile(board, rng):
+    """Put a new tile on a list-of-rows board of any size, drawing like the packed engine's spawn."""
+    size = len(board)
+    empty = [i for i in range(size * size) if not board[i // size][i % size]]
+    if empty:
+        cell = rng.choice(empty)
+        board[cell // size][cell % size] = 2 if rng.random() < TWO_PROBABILITY else 4
+
+
+def encode_replay(size, seed, score, moves):
+    """Pack a game into a log; moves are indexes into DIRECTIONS."""
+    packed = bytearray((len(moves) + 3) // 4)
+    for index, direction in enumerate(moves):
+        packed[index >> 2] |= direction << (2 * (index & 3))
+    return HEADER.pack(VERSION, size, seed, score, len(moves)) + bytes(packed)
+
+
+def decode_replay(data, offset=0):
+    """Return (size, seed, score, moves, end) for the log starting at offset.
+
+    moves is a uint8 array of DIRECTIONS indexes and end the offset just
+    past the log. Raises ValueError for a truncated or unknown log.
+    """
+    if len(data) - offset < HEADER.size:
+        raise ValueError("replay log is truncated")
+    version, size, seed, score, count = HEADER.unpack_from(data, offset)
+    if version != VERSION:
+        raise ValueError(f"unknown replay log version {version}")
+    start = offset + HEADER.size
+    end = start + (count + 3) // 4
+    if len(data) < end:
+        raise ValueError("replay log is truncated")
+    packed = np.frombuffer(data, dtype=np.uint8, count=end - start, offset=start)
+    moves = ((packed[:, None] >> np.array([0, 2, 4, 6], dtype=np.uint8)) & 3).reshape(-1)[:count]
+    return size, seed, score, moves, end
+
+
+def split_replays(data):
+    """Cut concatenated logs into a list of single logs."""
+    replays = []
+    offset = 0
+    while offset < len(data):
+        end = decode_replay(data, offset)[4]
+        replays.append(bytes(data[offset:end]))
+        offset = end
+    return replays
+
+
+def _draw_tiles(empty, seeds, draws, rng_active):
+    """Seeded new tiles for a (G, cells) mask of empty cells, in row-major order.
+
+    Returns (games, cells, exponents) for the games where rng_active is set
+    and a cell is free, and advances their draw counters.
+    """
+    counts = empty.sum(axis=1).astype(np.uint64)
+    games = np.flatnonzero(rng_active & (counts > 0))
+    cell_draw = _splitmix64_array(seeds[games], draws[games])
+    tile_draw = _splitmix64_array(seeds[games], draws[games] + np.uint64(1))
+    draws[games] += np.uint64(2)
+    picks = ((cell_draw >> np.uint64(32)) * counts[games]) >> np.uint64(32)
+    # Index of the picks-th empty cell: the first place the running count of empties passes it.
+    running = np.cumsum(empty[games], axis=1)
+    cells = (running > picks.astype(np.int64)[:, None]).argmax(axis=1)
+    tiles = np.where((tile_draw >> np.uint64(11)) * 2.0 ** -53 < TWO_PROBABILITY, 1, 2)
+    return games, cells, tiles
+
+
+def _spawn(boards, seeds, draws, rng_active):
+    """Add the next seeded tile to each board where rng_active is set."""
+    flat = boards.reshape(len(boards), -1)
+    games, cells, tiles = _draw_tiles(flat == 0, seeds, draws, rng_active)
+    flat[games, cells] = tiles
+
+
+def _spawn_packed(boards, seeds, draws, rng_active):
+    """_spawn for an array of packed 4x4 boards."""
+    empty = (boards[:, None] >> NIBBLE_SHIFTS) & np.uint64(0xF) == 0
+    games, cells, tiles = _draw_tiles(empty, seeds, draws, rng_active)
+    boards[games] |= tiles.astype(np.uint64) << NIBBLE_SHIFTS[cells]
+
+
+@lru_cache(maxsize=None)
+def _packed_tables():
+    """The engine's row tables as arrays: slides indexed by (0 for left, 1 for right, row), and points."""
+    left, right, score = row_tables()
+    slides = np.array([left, right], dtype=np.uint64)
+    return slides, np.array(score, dtype=np.int64)
+
+
+def _move_packed(boards, directions):
+    """Slide each packed board in its own direction (an index into DIRECTIONS); returns (boards, points)."""
+    slides, score = _packed_tables()
+    # Up and down slide the transposed rows left and right, like the engine's move()
+    vertical = directions < 2
+    side = directions & 1
+    rows = np.where(vertical, transpose(boards), boards)
+    slid = np.zeros_like(boards)
+    points = np.zeros(len(boards), dtype=np.int64)
+    for shift in (0, 16, 32, 48):
+        row = (rows >> np.uint64(shift)) & np.uint64(ROW_MASK)
+        slid |= slides[side, row] << np.uint64(shift)
+        points += score[row]
+    return np.where(vertical, transpose(slid), slid), points
+
+
+def _move_table(moves):
+    """Pad the games' move arrays into one (games, steps) table; returns (lengths, table)."""
+    lengths = np.array([len(m) for m in moves], dtype=np.int64)
+    table = np.zeros((len(moves), int(lengths.max(initial=0))), dtype=np.uint8)
+    for game, game_moves in enumerate(moves):
+        table[game, :len(game_moves)] = game_moves
+    return lengths, table
+
+
+def _verify_size(size, seeds, claimed, moves):
+    games = len(seeds)
+    lengths, table = _move_table(moves)
+    seeds = np.array(seeds, dtype=np.uint64)
+    draws = np.zeros(games, dtype=np.uint64)
+    boards = np.zeros((games, size, size), dtype=np.uint8)
+    everyone = np.ones(games, dtype=bool)
+    _spawn(boards, seeds, draws, everyone)
+    _spawn(boards, seeds, draws, everyone)
+    scores = np.zeros(games, dtype=np.int64)
+    valid = np.ones(games, dtype=bool)
+    for step in range(table.shape[1]):
+        active = valid & (step < lengths)
+        moved = np.zeros(games, dtype=bool)
+        for index, direction in enumerate(DIRECTIONS):
+            chosen = np.flatnonzero(active & (table[:, step] == index))
+            if len(chosen):
+                boards[chosen], points, changed = move_boards(boards[chosen], direction)
+                scores[chosen] += points
+                moved[chosen] = changed
+        # A recorded move that changes nothing was never played
+        valid &= moved | ~active
+        _spawn(boards, seeds, draws, active & valid)
+    scores = np.where(valid, scores, -1)
+    return valid & (scores == np.array(claimed, dtype=np.int64)), scores
+
+
+def _verify_packed(seeds, claimed, moves):
+    """_verify_size for 4x4 logs, on packed boards."""
+    games = len(seeds)
+    lengths, table = _move_table(moves)
+    seeds = np.array(seeds, dtype=np.uint64)
+    draws = np.zeros(games, dtype=np.uint64)
+    boards = np.zeros(games, dtype=np.uint64)
+    everyone = np.ones(games, dtype=bool)
+    _spawn_packed(boards, seeds, draws, everyone)
+    _spawn_packed(boards, seeds, draws, everyone)
+    scores = np.zeros(games, dtype=np.int64)
+    valid = np.ones(games, dtype=bool)
+    for step in range(table.shape[1]):
+        active = np.flatnonzero(valid & (step < lengths))
+        if not len(active):
+            break
+        slid, points = _move_packed(boards[active], table[active, step])
+        valid[active[slid == boards[active]]] = False
+        boards[active] = slid
+        scores[active] += points
+        _spawn_packed(boards, seeds, draws, valid & (step < lengths))
+    scores = np.where(valid, scores, -1)
+    return valid & (scores == np.array(claimed, dtype=np.int64)), scores
+
+
+def _verify_one_packed(seed, moves):
+    """Recomputed score of one 4x4 log played through the engine's move() and spawn(), or -1."""
+    rng = ReplayRandom(seed)
+    board = spawn(spawn(0, rng), rng)
+    score = 0
+    for index in moves.tolist():
+        moved, points = move(board, DIRECTIONS[index])
+        if moved == board:
+            return -1
+        board = spawn(moved, rng)
+        score += points
+    return score
+
+
+def verify_replays(replays):
+    """Re-play a batch of logs together.
+
+    Returns (valid, scores): valid[i] is True when log i decodes, every
+    move changes the board, and the recomputed score equals the one it
+    claims; scores[i] is the recomputed score (-1 when invalid).
+    """
+    valid = np.zeros(len(replays), dtype=bool)
+    scores = np.full(len(replays), -1, dtype=np.int64)
+    by_size = {}
+    for index, data in enumerate(replays):
+        try:
+            size, seed, score, moves, end = decode_replay(data)
+        except ValueError:
+            continue
+        if end != len(data) or size < 2:
+            continue
+        by_size.setdefault(size, []).append((index, seed, score, moves))
+    for size, logs in by_size.items():
+        indexes = [index for index, _, _, _ in logs]
+        seeds = [seed for _, seed, _, _ in logs]
+        claimed = [score for _, _, score, _ in logs]
+        moves = [moves for _, _, _, moves in logs]
+        if size != SIZE:
+            valid[indexes], scores[indexes] = _verify_size(size, seeds, claimed, moves)
+        elif len(logs) == 1:
+            # A lone log plays faster move by move than as a batch of one
+            score = _verify_one_packed(seeds[0], moves[0])
+            valid[indexes[0]], scores[indexes[0]] = score >= 0 and score == claimed[0], score
+        else:
+            valid[indexes], scores[indexes] = _verify_packed(seeds, claimed, moves)
+    return valid, scores
+
+
+def verify_replay(data):
+    """Recomputed score of one log, or None if the log does not check out."""
+    valid, scores = verify_replays([data])
+    return int(scores[0]) if valid[0] else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check 2048 replay logs by playing them again.")
+    parser.add_argument("files", nargs="+", help="files of concatenated replay logs")
+    args = parser.parse_args(argv)
+
+    for path in args.files:
+        with open(path, 'rb') as handle:
+            replays = split_replays(handle.read())
+        start = time.perf_counter()
+        valid, _ = verify_replays(replays)
+        seconds = time.perf_counter() - start
+        rate = len(replays) / seconds if seconds else 0.0
+        print(f"{path}: {int(valid.sum())}/{len(replays)} valid, {seconds:.2f} s ({rate:.0f} replays/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+# games/game_2048_sim.py
+#
+# Headless 2048 for playing thousands of games at once. A batch of boards is
+# one NumPy array of tile exponents with shape (G, N, N); a move slides and
+# merges every board of the batch with a handful of whole-array operations,
+# and new tiles are spawned on all of them together, with the same rules as
+# games/game_2048_engine.py (a 2 with probability TWO_PROBABILITY, else a 4,
+# on a uniformly chosen empty cell).
+#
+# slide_left works on rows of any length, so the same kernel moves boards of
+# every size. Every size also keeps the packed engine's tile limit: two
+# 32768 tiles (exponent MAX_EXPONENT) do not merge.
+#
+#     python -m games.game_2048_sim --games 10000 --policy corner
+#
+# reports games per second and the score and largest-tile distributions.
+
+import argparse
+import time
+
+import numpy as np
+
+from games.game_2048_engine import DIRECTIONS, MAX_EXPONENT, TWO_PROBABILITY
+from games.game_2048_ai import choose_move
+
+
+def slide_left(rows):
+    """Slide and merge every row of a (rows, length) exponent array toward column 0.
+
+    Returns (rows, points) with the points each row scored.
+    """
+    rows = _compact(rows)
+    points = np.zeros(len(rows), dtype=np.int64)
+    # Merges go left to right; a merged tile leaves a hole, so it cannot merge again.
+    for col in range(rows.shape[1] - 1):
+        here = rows[:, col]
+        merge = (here != 0) & (here == rows[:, col + 1]) & (here < MAX_EXPONENT)
+        if not merge.any():
+            continue
+        here[merge] += 1
+        rows[merge, col + 1] = 0
+        points[merge] += np.left_shift(1, here[merge].astype(np.int64))
+    return _compact(rows), points
+
+
+def _compact(rows):
+    # Sort each row on (is empty, column): tiles first, in their original order.
+    length = rows.shape[1]
+    order = ((rows == 0) * length + np.arange(length)).argsort(axis=1)
+    return np.take_along_axis(rows, order, axis=1)
+
+
+def _oriented(boards, direction):
+    """View boards so that direction becomes a slide to the left (its own inverse)."""
+    if direction == 'left':
+        return boards
+    if direction == 'right':
+        return boards[:, :, ::-1]
+    if direction == 'up':
+        return boards.transpose(0, 2, 1)
+    if direction == 'down':
+        return boards.transpose(0, 2, 1)[:, :, ::-1]
+    raise ValueError(f"unknown direction {direction!r}")
+
+
+def move_boards(boards, direction):
+    """Return (boards, points, moved) after sliding a (G, N, N) batch in direction."""
+    games, size, _ = boards.shape
+    view = _oriented(boards, direction)
+    rows, points = slide_left(view.reshape(games * size, size))
+    slid = np.empty_like(boards)
+    _oriented(slid, direction)[...] = rows.reshape(games, size, size)
+    moved = (slid != boards).reshape(games, -1).any(axis=1)
+    return slid, points.reshape(games, size).sum(axis=1), moved
+
+
+def legal_moves(boards):
+    """(G, 4) mask of the DIRECTIONS that change each board, without making the moves.
+
+    A slide changes a board exactly when some tile has an empty cell or an
+    equal tile it can merge with next to it on the side it slides toward.
+    """
+    legal = np.empty((len(boards), len(DIRECTIONS)), dtype=bool)
+    for index, direction in enumerate(DIRECTIONS):
+        view = _oriented(boards, direction)
+        target, tile = view[:, :, :-1], view[:, :, 1:]
+        mergeable = (target == tile) & (tile < MAX_EXPONENT)
+        legal[:, index] = ((tile != 0) & ((target == 0) | mergeable)).reshape(len(boards), -1).any(axis=1)
+    return legal
+
+
+def spawn_tiles(boards, rng):
+    """Add one new tile to each board that has room."""
+    flat = boards.reshape(len(boards), -1)
+    empty = flat == 0
+    keys = np.where(empty, rng.random(empty.shape), -1.0)
+    cells = keys.argmax(axis=1)
+    games = np.flatnonzero(empty.any(axis=1))
+    tiles = np.where(rng.random(len(games)) < TWO_PROBABILITY, 1, 2)
+    flat[games, cells[games]] = tiles
+    return boards
+
+
+def can_move(boards):
+    """True for each board that still has an empty cell or two equal neighbours that can merge."""
+    games = len(boards)
+    empty = (boards == 0).reshape(games, -1).any(axis=1)
+    across = ((boards[:, :, 1:] == boards[:, :, :-1]) & (boards[:, :, 1:] < MAX_EXPONENT)).reshape(games, -1).any(axis=1)
+    down = ((boards[:, 1:, :] == boards[:, :-1, :]) & (boards[:, 1:, :] < MAX_EXPONENT)).reshape(games, -1).any(axis=1)
+    return empty | across | down
+
+
+def new_boards(games, size=4, rng=None):
+    """A batch of fresh boards, each with two starting tiles."""
+    rng = rng or np.random.default_rng()
+    boards = np.zeros((games, size, size), dtype=np.uint8)
+    spawn_tiles(boards, rng)
+    spawn_tiles(boards, rng)
+    return boards
+
+
+def from_grid(grid):
+    """A batch of one board from a list of rows of tile values (0, 2, 4, ...)."""
+    values = np.array(grid, dtype=np.int64)
+    exponents = np.zeros(values.shape, dtype=np.uint8)
+    tiles = values > 0
+    exponents[tiles] = np.log2(values[tiles]).astype(np.uint8)
+    return exponents[None]
+
+
+def to_grid(board):
+    """One (N, N) exponent board back to a list of rows of tile values."""
+    return np.where(board > 0, np.left_shift(1, board.astype(np.int64)), 0).tolist()
+
+
+# A policy gets the boards of the games still running, a (games, 4) mask of
+# which DIRECTIONS change each board, and the generator; it returns one
+# direction index per game.
+
+def random_policy(boards, legal, rng):
+    return np.where(legal, rng.random(legal.shape), -1.0).argmax(axis=1)
+
+
+def corner_policy(boards, legal, rng):
+    """Down, else left, else right, else up: keeps the big tiles in a bottom corner."""
+    preference = [DIRECTIONS.index(d) for d in ('down', 'left', 'right', 'up')]
+    ranked = legal[:, preference]
+    return np.array(preference)[ranked.argmax(axis=1)]
+
+
+def board_policy(choose):
+    """Wrap a one-board chooser (packed 4x4 board -> direction name) as a batch policy."""
+    shifts = np.arange(16, dtype=np.uint64) * np.uint64(4)
+
+    def policy(boards, legal, rng):
+        packed = (boards.reshape(len(boards), -1).astype(np.uint64) << shifts).sum(axis=1)
+        choices = np.empty(len(boards), dtype=np.int64)
+        for game, board in enumerate(packed.tolist()):
+            direction = choose(board)
+            choices[game] = DIRECTIONS.index(direction) if direction else legal[game].argmax()
+        return choices
+
+    return policy
+
+
+def expectimax_policy(time_budget=0.005):
+    """The hint and autoplay AI of the 2048 page, one board at a time (4x4 only)."""
+    return board_policy(lambda board: choose_move(board, time_budget)[0])
+
+
+POLICIES = {
+    'random': lambda args: random_policy,
+    'corner': lambda args: corner_policy,
+    'expectimax': lambda args: expectimax_policy(args.budget),
+}
+
+
+def simulate(policy, games=1000, size=4, seed=None, max_moves=None):
+    """Play games boards to the end (or max_moves moves) with policy.
+
+    Returns a dict with per-game 'scores', 'max_tiles' and 'moves' arrays,
+    plus 'seconds', 'games_per_second' and 'moves_per_second'.
+    """
+    start = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    boards = new_boards(games, size, rng)
+    scores = np.zeros(games, dtype=np.int64)
+    moves = np.zeros(games, dtype=np.int64)
+    alive = can_move(boards)
+    step = 0
+    while alive.any() and (max_moves is None or step < max_moves):
+        running = np.flatnonzero(alive)
+        current = boards[running]
+        legal = legal_moves(current)
+        choice = policy(current, legal, rng)
+        # A policy that picks a move which changes nothing gets the first one that does.
+        choice = np.where(legal[np.arange(len(running)), choice], choice, legal.argmax(axis=1))
+        after = np.empty_like(current)
+        for index, direction in enumerate(DIRECTIONS):
+            chosen = choice == index
+            if chosen.any():
+                after[chosen], points, _ = move_boards(current[chosen], direction)
+                scores[running[chosen]] += points
+        spawn_tiles(after, rng)
+        boards[running] = after
+        moves[running] += 1
+        alive[running] = can_move(after)
+        step += 1
+
+    seconds = time.perf_counter() - start
+    return {
+        'scores': scores,
+        'max_tiles': np.left_shift(1, boards.reshape(games, -1).max(axis=1).astype(np.int64)),
+        'moves': moves,
+        'seconds': seconds,
+        'games_per_second': games / seconds,
+        'moves_per_second': int(moves.sum()) / seconds,
+    }
+
+
+def summarize(results):
+    """Printable lines: throughput, score percentiles and how often each tile was reached."""
+    scores, tiles = results['scores'], results['max_tiles']
+    games = len(scores)
+    lines = [
+        f"{games} games in {results['seconds']:.2f} s: {results['games_per_second']:.0f} games/s, "
+        f"{results['moves_per_second']:.0f} moves/s",
+        "score  mean {:.0f}  min {}  p10 {:.0f}  median {:.0f}  p90 {:.0f}  max {}".format(
+            scores.mean(), scores.min(), *np.percentile(scores, (10, 50, 90)), scores.max(),
+        ),
+        f"{'max tile':>9}{'games':>8}{'reached':>9}",
+    ]
+    values, counts = np.unique(tiles, return_counts=True)
+    reached = games
+    for value, count in zip(values.tolist(), counts.tolist()):
+        lines.append(f"{value:>9}{count:>8}{100 * reached / games:>8.1f}%")
+        reached -= count
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play many 2048 games at once and report the results.")
+    parser.add_argument("--games", type=int, default=1000, help="games played in one batch")
+    parser.add_argument("--size", type=int, default=4, help="board width and height")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="corner", help="how moves are chosen")
+    parser.add_argument("--budget", type=float, default=0.005, help="seconds per move for the expectimax policy")
+    parser.add_argument("--seed", type=int, default=None, help="random seed, for repeatable runs")
+    parser.add_argument("--max-moves", type=int, default=None, help="stop every game after this many moves")
+    args = parser.parse_args(argv)
+    if args.policy == 'expectimax' and args.size != 4:
+        parser.error("the expectimax policy only plays 4x4 boards")
+
+    results = simulate(POLICIES[args.policy](args), args.games, args.size, args.seed, args.max_moves)
+    for line in summarize(results):
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
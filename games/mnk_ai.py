@@ -0,0 +1,154 @@
+# games/mnk_ai.py
+#
+# Opponent for m,n,k-games on games/mnk_engine.py. Full-width search is
+# hopeless on a 15x15 board, so every node only looks at empty cells near
+# existing stones, ranked by how much they build on the side to move's
+# windows and break into the opponent's. Threats cut the list further: a
+# cell that completes k in a row is the only move tried, and if the
+# opponent has a window one stone short, only the blocking cells are.
+# The rest is negamax with alpha-beta and iterative deepening against a
+# per-move time budget, as in games/connect4_ai.py.
+
+import time
+
+WIN_SCORE = 10 ** 9
+CHECK_EVERY = 256
+ROOT_WIDTH = 12
+WIDTH = 8
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search once the move's time budget is spent."""
+
+
+def candidate_moves(board, player, width=WIDTH):
+    """Return the cells worth searching for player, most promising first."""
+    if not board.history:
+        return [(board.rows // 2) * board.cols + board.cols // 2]
+    cells = board.cells
+    own = board.counts[player - 1]
+    other = board.counts[2 - player]
+    weights = board.weights
+    last = board.k - 1
+    near = set()
+    for stone in board.history:
+        for cell in board.neighbours[stone]:
+            if not cells[cell]:
+                near.add(cell)
+
+    blocks = []
+    scored = []
+    for cell in near:
+        value = 0
+        for w in board.cell_windows[cell]:
+            n, o = own[w], other[w]
+            if not o:
+                if n == last:
+                    return [cell]
+                value += weights[n + 1]
+            if not n:
+                if o == last:
+                    blocks.append(cell)
+                value += weights[o + 1]
+        scored.append((value, cell))
+    if blocks:
+        return list(dict.fromkeys(blocks))
+    scored.sort(reverse=True)
+    return [cell for _, cell in scored[:width]]
+
+
+class Search:
+    """One move's worth of iterative-deepening negamax."""
+
+    def __init__(self, board, player, deadline, stop=None):
+        self.board = board
+        self.player = player
+        self.deadline = deadline
+        # Optional threading.Event that ends the search early.
+        self.stop = stop
+        self.nodes = 0
+
+    def expired(self):
+        return (self.stop is not None and self.stop.is_set()) or time.perf_counter() > self.deadline
+
+    def negamax(self, depth, alpha, beta, player):
+        self.nodes += 1
+        if self.nodes % CHECK_EVERY == 0 and self.expired():
+            raise SearchTimeout
+        board = self.board
+        if depth == 0:
+            return board.score if player == 1 else -board.score
+        moves = candidate_moves(board, player)
+        if not moves:
+            return 0
+        best = -WIN_SCORE
+        for cell in moves:
+            if board.play(cell, player):
+                score = WIN_SCORE - board.moves
+            elif board.is_full():
+                score = 0
+            else:
+                score = -self.negamax(depth - 1, -beta, -alpha, 3 - player)
+            board.undo()
+            if score > best:
+                best = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        return best
+
+    def root(self, depth, order):
+        """Search every root move to depth and return (best_cell, best_score)."""
+        board = self.board
+        alpha, beta = -WIN_SCORE, WIN_SCORE
+        best_cell, best_score = order[0], -WIN_SCORE
+        for cell in order:
+            if board.play(cell, self.player):
+                score = WIN_SCORE - board.moves
+            elif board.is_full():
+                score = 0
+            else:
+                score = -self.negamax(depth - 1, -beta, -alpha, 3 - self.player)
+            board.undo()
+            if score > best_score:
+                best_cell, best_score = cell, score
+                alpha = max(alpha, score)
+        return best_cell, best_score
+
+
+def choose_move(board, player, time_budget=1.0, max_depth=10, stop=None):
+    """Pick a cell for player within roughly time_budget seconds.
+
+    Returns (cell, info) where info holds the completed depth, score,
+    node count and elapsed seconds. The board is searched in place and
+    left as it was. Setting the optional stop event ends the search as if
+    its time had run out.
+    """
+    start = time.perf_counter()
+    search = Search(board, player, start + time_budget, stop)
+    order = candidate_moves(board, player, ROOT_WIDTH)
+    if not order:
+        return None, {'depth': 0, 'score': 0, 'nodes': 0, 'seconds': 0.0}
+
+    best_cell, best_score, depth_done = order[0], 0, 0
+    history = board.history[:]
+    for depth in range(1, min(max_depth, board.size - board.moves) + 1):
+        try:
+            cell, score = search.root(depth, order)
+        except SearchTimeout:
+            while len(board.history) > len(history):
+                board.undo()
+            break
+        best_cell, best_score, depth_done = cell, score, depth
+        order.remove(cell)
+        order.insert(0, cell)
+        if abs(score) >= WIN_SCORE - board.size or len(order) == 1:
+            break
+
+    return best_cell, {
+        'depth': depth_done,
+        'score': best_score,
+        'nodes': search.nodes,
+        'seconds': time.perf_counter() - start,
+    }
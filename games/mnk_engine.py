@@ -0,0 +1,153 @@
+# games/mnk_engine.py
+#
+# Game core for m,n,k-games: k in a row on an m x n board (Tic Tac Toe is
+# 3,3,3 and Gomoku is 15,15,5). Cells are a flat list of ints (0 empty,
+# 1 and 2 the players), row by row. Every line of k cells is a "window";
+# each player keeps a stone count per window, so playing a stone touches
+# only the windows through that cell. A count reaching k is a win, and a
+# running evaluation is updated from the same counts, so neither the win
+# check nor the score ever rescans the board.
+
+from functools import lru_cache
+
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+class Lines:
+    """Window tables for one board shape, shared by every board of that shape."""
+
+    def __init__(self, rows, cols, k):
+        self.windows = []
+        for row in range(rows):
+            for col in range(cols):
+                for dr, dc in DIRECTIONS:
+                    end_row, end_col = row + (k - 1) * dr, col + (k - 1) * dc
+                    if 0 <= end_row < rows and 0 <= end_col < cols:
+                        self.windows.append(tuple((row + j * dr) * cols + col + j * dc for j in range(k)))
+        self.cell_windows = [[] for _ in range(rows * cols)]
+        for w, window in enumerate(self.windows):
+            for cell in window:
+                self.cell_windows[cell].append(w)
+        self.neighbours = []
+        for cell in range(rows * cols):
+            row, col = divmod(cell, cols)
+            self.neighbours.append([
+                r * cols + c
+                for r in range(max(0, row - 2), min(rows, row + 3))
+                for c in range(max(0, col - 2), min(cols, col + 3))
+                if (r, c) != (row, col)
+            ])
+
+
+@lru_cache(maxsize=None)
+def lines(rows, cols, k):
+    return Lines(rows, cols, k)
+
+
+@lru_cache(maxsize=None)
+def window_weights(k):
+    """Value of a window holding n stones of one player and none of the other."""
+    return tuple(0 if n == 0 else 4 ** n for n in range(k + 1))
+
+
+class MNKBoard:
+    """m,n,k position with per-window stone counts and an incremental score."""
+
+    def __init__(self, rows=3, cols=3, k=3):
+        self.rows, self.cols, self.k = rows, cols, k
+        self.size = rows * cols
+        tables = lines(rows, cols, k)
+        self.windows = tables.windows
+        self.cell_windows = tables.cell_windows
+        self.neighbours = tables.neighbours
+        self.weights = window_weights(k)
+        self.cells = [0] * self.size
+        self.counts = ([0] * len(self.windows), [0] * len(self.windows))
+        self.score = 0  # from player 1's point of view
+        self.history = []
+        self.winner = None
+        self.win_ply = 0
+
+    @classmethod
+    def from_rows(cls, rows, k, players=(1, 2)):
+        """Build a board from a 2D grid, mapping the cell values in players to 1 and 2.
+
+        Moves are replayed in row order, so history is not the real move order.
+        """
+        board = cls(len(rows), len(rows[0]), k)
+        for r, row in enumerate(rows):
+            for c, value in enumerate(row):
+                if value == players[0]:
+                    board.play(r * board.cols + c, 1)
+                elif value == players[1]:
+                    board.play(r * board.cols + c, 2)
+        return board
+
+    def copy(self):
+        other = MNKBoard.__new__(MNKBoard)
+        other.__dict__.update(self.__dict__)
+        other.cells = self.cells[:]
+        other.counts = (self.counts[0][:], self.counts[1][:])
+        other.history = self.history[:]
+        return other
+
+    @property
+    def moves(self):
+        return len(self.history)
+
+    def to_move(self):
+        return 1 if self.moves % 2 == 0 else 2
+
+    def is_full(self):
+        return self.moves == self.size
+
+    def empty_cells(self):
+        return [i for i in range(self.size) if not self.cells[i]]
+
+    def play(self, cell, player):
+        """Place a stone and return True if it completes k in a row."""
+        weights = self.weights
+        own = self.counts[player - 1]
+        other = self.counts[2 - player]
+        sign = 1 if player == 1 else -1
+        won = False
+        for w in self.cell_windows[cell]:
+            n = own[w]
+            if not other[w]:
+                self.score += sign * (weights[n + 1] - weights[n])
+                if n + 1 == self.k:
+                    won = True
+            elif not n:
+                # The window was the opponent's and is now dead.
+                self.score += sign * weights[other[w]]
+            own[w] = n + 1
+        self.cells[cell] = player
+        self.history.append(cell)
+        if won and self.winner is None:
+            self.winner, self.win_ply = player, len(self.history)
+        return won
+
+    def undo(self):
+        cell = self.history.pop()
+        player = self.cells[cell]
+        weights = self.weights
+        own = self.counts[player - 1]
+        other = self.counts[2 - player]
+        sign = 1 if player == 1 else -1
+        for w in self.cell_windows[cell]:
+            n = own[w] = own[w] - 1
+            if not other[w]:
+                self.score -= sign * (weights[n + 1] - weights[n])
+            elif not n:
+                self.score -= sign * weights[other[w]]
+        self.cells[cell] = 0
+        if self.winner is not None and len(self.history) < self.win_ply:
+            self.winner = None
+
+    def is_win_at(self, cell):
+        """True if the stone on cell is part of k in a row."""
+        player = self.cells[cell]
+        if not player:
+            return False
+        own = self.counts[player - 1]
+        return any(own[w] == self.k for w in self.cell_windows[cell])
@@ -2,6 +2,22 @@ import streamlit as st
 import time
 from utils import display_game_time
 from leaderboard import update_leaderboard
+from games.n_queens_engine import (
+    QueenTracker, SolutionPager, Solutions, count_fundamental, iter_by_symmetry, iter_fundamental,
+)
+from games.n_queens_count import get_pool, parallel_count
+from games.n_queens_local import board_image, min_conflicts
+from games.ai_service import POLL_SECONDS, request_move, take_result
+
+MAX_SIZE = 14
+FUNDAMENTAL_COUNT_MAX = 12
+LARGE_MAX_SIZE = 100000
+LARGE_IMAGE_PIXELS = 600
+MODES = {
+    "Visualize Solutions": 'visualize',
+    "Play Yourself": 'play',
+    "Find One Solution (large N)": 'large',
+}
 
 def render_n_queens():
     st.title("N-Queens Puzzle")
@@ -10,7 +26,7 @@ def render_n_queens():
     if 'n_queens' not in st.session_state.games:
         st.session_state.games['n_queens'] = {
             'size': 8,
-            'solutions': [],
+            'pager': None,
             'current_solution': 0,
             'user_board': None,
             'mode': 'visualize'
@@ -25,24 +41,51 @@ def render_n_queens():
         game_state['user_board'] = None
     
     # Mode selection
-    mode = st.radio("Select mode", ["Visualize Solutions", "Play Yourself"], 
-                   index=0 if game_state['mode'] == 'visualize' else 1)
+    mode = st.radio("Select mode", list(MODES), 
+                   index=list(MODES.values()).index(game_state['mode']))
     
     # Update mode in game state
-    game_state['mode'] = 'visualize' if mode == "Visualize Solutions" else 'play'
+    game_state['mode'] = MODES[mode]
+    if game_state['mode'] == 'large':
+        render_large_board(game_state)
+        display_game_time()
+        return
     
-    size = st.slider("Board size", 4, 12, game_state['size'])
+    size = st.slider("Board size", 4, MAX_SIZE, game_state['size'])
     
     if game_state['mode'] == 'visualize':
-        if st.button("Find Solutions") or game_state['size'] != size:
+        fundamental = st.checkbox(
+            "Fundamental solutions only", value=game_state.get('fundamental', False),
+            help="Show one solution per group of boards that are rotations or reflections of each other",
+        )
+        pager = game_state.get('pager')
+        if st.button("Find Solutions") or game_state['size'] != size or pager is None or pager.size != size:
             game_state['size'] = size
-            game_state['solutions'] = solve_n_queens(size)
-            game_state['current_solution'] = 0
+            game_state['count'] = None
+            request_move(game_state, 'count_future', count_for_display, size, executor='count')
+            pager = None
             st.session_state.game_start_time = time.time()
+        if pager is None or pager.fundamental != fundamental:
+            game_state['pager'] = pager = SolutionPager(size, fundamental=fundamental)
+            game_state['fundamental'] = fundamental
+            game_state['current_solution'] = 0
         
-        if game_state['solutions']:
-            st.write(f"Solution {game_state['current_solution'] + 1} of {len(game_state['solutions'])}")
-            display_queens_board(game_state['solutions'][game_state['current_solution']])
+        solution = pager.get(game_state['current_solution'])
+        if solution is not None:
+            if game_state.get('count') is None:
+                show_solution_position(game_state)
+            else:
+                fundamental_count, total = game_state['count']
+                shown = fundamental_count if fundamental else total
+                if shown is None:
+                    st.write(f"Solution {game_state['current_solution'] + 1}")
+                else:
+                    st.write(f"Solution {game_state['current_solution'] + 1} of {shown:,}")
+                if fundamental_count is None:
+                    st.caption(f"{total:,} solutions in total")
+                else:
+                    st.caption(f"{fundamental_count:,} fundamental solutions, {total:,} in total")
+            display_queens_board(solution)
             
             col1, col2 = st.columns(2)
             with col1:
@@ -50,69 +93,108 @@ def render_n_queens():
                     game_state['current_solution'] -= 1
                     st.rerun()
             with col2:
-                if st.button("Next Solution") and game_state['current_solution'] < len(game_state['solutions']) - 1:
+                if st.button("Next Solution") and pager.get(game_state['current_solution'] + 1) is not None:
                     game_state['current_solution'] += 1
                     st.rerun()
+        else:
+            st.info(f"There is no way to place {size} queens on a {size}×{size} board.")
     else:
         # Play mode
         if game_state['size'] != size or game_state['user_board'] is None:
             game_state['size'] = size
             game_state['user_board'] = [[0 for _ in range(size)] for _ in range(size)]
             st.session_state.game_start_time = time.time()
+        tracker = game_state.get('tracker')
+        if tracker is None or tracker.board is not game_state['user_board']:
+            tracker = game_state['tracker'] = QueenTracker(game_state['user_board'])
         
         st.write("Place queens on the board (click on squares). Try to place all queens without them attacking each other!")
+        show_attacked = st.checkbox("Mark attacked squares", value=game_state.get('show_attacked', False))
+        game_state['show_attacked'] = show_attacked
         
         # Display interactive board
-        display_interactive_board(game_state['user_board'])
+        display_interactive_board(game_state['user_board'], tracker, show_attacked)
         
         # Check if the current placement is valid
-        if is_valid_solution(game_state['user_board']):
+        if tracker.is_solved:
             st.success("Congratulations! You've solved the N-Queens puzzle!")
             update_leaderboard('n_queens', st.session_state.player_name, 1)
         else:
-            queens_placed = sum(sum(row) for row in game_state['user_board'])
-            st.write(f"Queens placed: {queens_placed}/{size}")
+            st.write(f"Queens placed: {tracker.queens}/{size}")
             
-            if queens_placed == size:
-                st.error("Some queens are attacking each other. Try again!")
+            if tracker.has_conflicts:
+                st.error(f"{tracker.attacking_pairs} pair(s) of queens are attacking each other (highlighted).")
         
         if st.button("Reset Board"):
             game_state['user_board'] = [[0 for _ in range(size)] for _ in range(size)]
+            game_state['tracker'] = QueenTracker(game_state['user_board'])
             st.rerun()
     
     display_game_time()
 
-def solve_n_queens(size):
-    solutions = []
-    
-    def is_safe(board, row, col):
-        # Check this row on left side
-        for i in range(col):
-            if board[row][i] == 1:
-                return False
-        # Check upper diagonal on left side
-        for i, j in zip(range(row, -1, -1), range(col, -1, -1)):
-            if board[i][j] == 1:
-                return False
-        # Check lower diagonal on left side
-        for i, j in zip(range(row, size, 1), range(col, -1, -1)):
-            if board[i][j] == 1:
-                return False
-        return True
+def solve_n_queens(size, fundamental=False):
+    """Every solution, or with fundamental=True one per rotation/reflection class."""
+    return Solutions(size, iter_fundamental(size) if fundamental else iter_by_symmetry(size))
+
+def count_for_display(size, stop=None):
+    """(fundamental, total) solution counts for the visualizer.
+
+    Past FUNDAMENTAL_COUNT_MAX only the total is counted, split across the
+    shared counting pool, since enumerating fundamental solutions gets too
+    slow. Returns None when stop is set before the count finishes.
+    """
+    if size <= FUNDAMENTAL_COUNT_MAX:
+        return count_fundamental(size)
+    pool, workers = get_pool()
+    total, _ = parallel_count(size, workers, pool=pool, stop=stop)
+    return None if total is None else (None, total)
+
+@st.fragment(run_every=POLL_SECONDS)
+def show_solution_position(game_state):
+    """"Solution k of N" line; N is counted in the background and filled in when ready."""
+    done, count = take_result(game_state, 'count_future')
+    if done:
+        game_state['count'] = count
+        st.rerun()
+    st.write(f"Solution {game_state['current_solution'] + 1} of … (counting)")
+
+def render_large_board(game_state):
+    """Find one solution for a very large board with min-conflicts local search."""
+    size = int(st.number_input(
+        "Board size", min_value=4, max_value=LARGE_MAX_SIZE,
+        value=game_state.get('large_size', 1000), step=1000,
+    ))
+    if st.button("Find a Solution"):
+        game_state['large_size'] = size
+        game_state['large_result'] = None
+        request_move(game_state, 'large_future', min_conflicts, size)
+        st.session_state.game_start_time = time.time()
     
-    def solve(board, col):
-        if col >= size:
-            solutions.append([row[:] for row in board])
-            return
-        for i in range(size):
-            if is_safe(board, i, col):
-                board[i][col] = 1
-                solve(board, col + 1)
-                board[i][col] = 0
+    if game_state.get('large_future') is not None:
+        poll_large_solution(game_state)
     
-    board = [[0 for _ in range(size)] for _ in range(size)]
-    solve(board, 0)
-    return solutions
+    result = game_state.get('large_result')
+    if result and result[0] is not None:
+        cols, stats = result
+        n = len(cols)
+        st.success(
+            f"Placed {n:,} queens with no two attacking each other after "
+            f"{stats['steps']:,} repair moves in {stats['seconds']:.2f} s"
+        )
+        image = board_image(cols, LARGE_IMAGE_PIXELS)
+        if n > LARGE_IMAGE_PIXELS:
+            caption = f"{n:,}×{n:,} board; each pixel covers about {n / LARGE_IMAGE_PIXELS:.0f}×{n / LARGE_IMAGE_PIXELS:.0f} squares"
+        else:
+            caption = f"{n:,}×{n:,} board"
+        st.image(image, caption=caption)
+
+@st.fragment(run_every=POLL_SECONDS)
+def poll_large_solution(game_state):
+    done, result = take_result(game_state, 'large_future')
+    if done:
+        game_state['large_result'] = result
+        st.rerun()
+    st.info("Searching with min-conflicts…")
 
 def display_queens_board(solution):
     size = len(solution)
@@ -121,36 +203,38 @@ def display_queens_board(solution):
         for col in range(size):
             color = "#eee" if (row + col) % 2 == 0 else "#999"
             text_color = "#000" if color == "#eee" else "#fff"
-            content = f"<span style='color:{text_color}'>♕</span>" if solution[row][col] == 1 else ""
+            content = f"<span style='color:{text_color}'>♕</span>" if solution[row] == col else ""
             html += f"<div style='width: 50px; height: 50px; background-color: {color}; display: flex; justify-content: center; align-items: center; font-size: 30px;'>{content}</div>"
     html += "</div>"
     st.markdown(html, unsafe_allow_html=True)
 
-def display_interactive_board(board):
+def display_interactive_board(board, tracker=None, show_attacked=False):
     size = len(board)
     cols = st.columns(size)
     
     for row in range(size):
         for col in range(size):
-            color = "#eee" if (row + col) % 2 == 0 else "#999"
-            text_color = "#000" if color == "#eee" else "#fff"
             queen = board[row][col] == 1
-            content = "♕" if queen else ""
+            attacked = tracker is not None and tracker.is_attacked(row, col)
+            content = "♕" if queen else ("·" if attacked and show_attacked else "")
             
             with cols[col]:
                 if st.button(
                     content,
                     key=f"queen_{row}_{col}",
                     help=f"Row {row+1}, Col {col+1}",
+                    # Queens under attack are drawn as primary buttons to stand out
+                    type="primary" if queen and attacked else "secondary",
                     on_click=toggle_queen,
-                    args=(row, col, board)
+                    args=(row, col, board, tracker)
                 ):
                     pass
     
     # Add CSS styling for the buttons
     st.markdown("""
     <style>
-        div[data-testid="stButton"] > button[kind="secondary"] {
+        div[data-testid="stButton"] > button[kind="secondary"],
+        div[data-testid="stButton"] > button[kind="primary"] {
             width: 50px;
             height: 50px;
             padding: 0;
@@ -159,6 +243,8 @@ def display_interactive_board(board):
             display: flex;
             justify-content: center;
             align-items: center;
+        }
+        div[data-testid="stButton"] > button[kind="secondary"] {
             background-color: var(--background-color);
             color: var(--text-color);
         }
@@ -167,9 +253,12 @@ def display_interactive_board(board):
     
     return board
 
-def toggle_queen(row, col, board):
-    # Toggle queen presence (1 becomes 0, 0 becomes 1)
-    board[row][col] = 1 - board[row][col]
+def toggle_queen(row, col, board, tracker=None):
+    # Toggle queen presence (1 becomes 0, 0 becomes 1), keeping the tracker's counts in step
+    if tracker is not None and tracker.board is board:
+        tracker.toggle(row, col)
+    else:
+        board[row][col] = 1 - board[row][col]
 
 def is_valid_solution(board):
     size = len(board)
@@ -0,0 +1,123 @@
+# games/n_queens_count.py
+#
+# Headless, multi-process solution counting for N-Queens. The count is cut
+# into independent pieces by the placements of the top one or two rows
+# (see split_prefixes in games/n_queens_engine.py), the pieces are counted
+# on a process pool and the weighted results summed:
+#
+#     python -m games.n_queens_count 14 15 16 --workers 8 --split 2
+#
+# Each line reports the total, whether it matches the published value,
+# wall time, and how busy each worker process was.
+#
+# The N-Queens page counts on one long-lived pool (get_pool) instead of
+# starting a pool per count, and drops a count once its stop event is set.
+
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from games.n_queens_engine import count_from, split_prefixes
+from games.ai_service import process_context
+
+# Published solution counts (OEIS A000170).
+KNOWN_TOTALS = {
+    1: 1, 2: 0, 3: 0, 4: 2, 5: 10, 6: 4, 7: 40, 8: 92, 9: 352, 10: 724,
+    11: 2680, 12: 14200, 13: 73712, 14: 365596, 15: 2279184,
+    16: 14772512, 17: 95815104, 18: 666090624,
+}
+# How often a count checks its stop event while the pieces are counted.
+STOP_CHECK_SECONDS = 0.05
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def count_prefix(size, prefix):
+    """Worker task: returns (weighted count, seconds, worker pid) for one prefix."""
+    start = time.perf_counter()
+    weight, occupied, left, right = prefix
+    count = weight * count_from(size, occupied, left, right)
+    return count, time.perf_counter() - start, os.getpid()
+
+
+def get_pool():
+    """Return (pool, workers) for the shared counting pool, one process per core, started on first use."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None:
+            _pool_workers = os.cpu_count() or 1
+            _pool = ProcessPoolExecutor(max_workers=_pool_workers, mp_context=process_context())
+        return _pool, _pool_workers
+
+
+def shutdown_pool():
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+            _pool_workers = 0
+
+
+def parallel_count(size, workers=None, split_rows=2, pool=None, stop=None):
+    """Count the solutions for size on a pool of workers processes.
+
+    Returns (total, stats) where stats holds the wall time, the number of
+    pieces, and the busy seconds of each worker process. Without a pool one
+    is started for this count and shut down after it. Setting the optional
+    stop event cancels the pieces not yet started and returns a total of None.
+    """
+    if pool is None:
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers, mp_context=process_context()) as pool:
+            return parallel_count(size, workers, split_rows, pool, stop)
+
+    start = time.perf_counter()
+    prefixes = split_prefixes(size, split_rows)
+    total = 0
+    busy = {}
+    pending = {pool.submit(count_prefix, size, prefix) for prefix in prefixes}
+    while pending:
+        if stop is not None and stop.is_set():
+            for future in pending:
+                future.cancel()
+            total = None
+            break
+        done, pending = wait(pending, timeout=STOP_CHECK_SECONDS, return_when=FIRST_COMPLETED)
+        for future in done:
+            count, seconds, pid = future.result()
+            total += count
+            busy[pid] = busy.get(pid, 0.0) + seconds
+    return total, {
+        'wall': time.perf_counter() - start,
+        'pieces': len(prefixes),
+        'workers': workers,
+        'worker_seconds': sorted(busy.values(), reverse=True),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Count N-Queens solutions on a process pool.")
+    parser.add_argument("sizes", nargs="+", type=int, help="board sizes to count")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--split", type=int, default=2, help="rows placed up front to cut the work into pieces")
+    args = parser.parse_args(argv)
+
+    print(f"{'N':<4}{'solutions':>12}{'check':>8}{'pieces':>8}{'wall s':>9}{'cpu s':>9}{'busiest s':>11}")
+    for size in args.sizes:
+        total, stats = parallel_count(size, args.workers, args.split)
+        known = KNOWN_TOTALS.get(size)
+        check = "-" if known is None else ("ok" if known == total else "WRONG")
+        busy = stats['worker_seconds']
+        print(
+            f"{size:<4}{total:>12}{check:>8}{stats['pieces']:>8}{stats['wall']:>9.2f}"
+            f"{sum(busy):>9.2f}{max(busy, default=0.0):>11.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
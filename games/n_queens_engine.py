@@ -0,0 +1,337 @@
+# games/n_queens_engine.py
+#
+# Bitmask backtracking for games/n_queens.py. Queens go in one row at a
+# time; the columns and the two diagonal directions already attacked are
+# three integers, so the free squares of a row are one AND-NOT away and
+# the lowest free square is free & -free. A solution is stored as a
+# permutation, the queen's column for each row, one byte per row.
+
+from collections import deque
+
+# How many recently produced solutions a SolutionPager keeps for "Previous".
+WINDOW = 64
+
+class SolutionCursor:
+    """Resumable enumeration: each next() call carries on where the last one stopped.
+
+    The search keeps its own stack of per-row bitmasks instead of recursing,
+    so it can stop after any solution and pick up again later, and each
+    solution costs one return no matter how deep the board is.
+    """
+
+    def __init__(self, size, first_row=None):
+        self.size = size
+        self.full = (1 << size) - 1
+        self.cols = bytearray(size)
+        self.occupied = [0] * size
+        self.left = [0] * size
+        self.right = [0] * size
+        self.free = [0] * size
+        self.row = 0 if size >= 1 else -1
+        if size >= 1:
+            # first_row optionally limits the columns tried for the top queen.
+            self.free[0] = self.full if first_row is None else first_row & self.full
+
+    def next(self):
+        """Return the next solution as bytes, or None once every solution has been produced."""
+        full, cols, free = self.full, self.cols, self.free
+        occupied, left, right = self.occupied, self.left, self.right
+        last = self.size - 1
+        row = self.row
+        while row >= 0:
+            options = free[row]
+            if not options:
+                row -= 1
+                continue
+            bit = options & -options
+            free[row] = options ^ bit
+            cols[row] = bit.bit_length() - 1
+            if row == last:
+                self.row = row
+                return bytes(cols)
+            o = occupied[row] | bit
+            l = ((left[row] | bit) << 1) & full
+            r = (right[row] | bit) >> 1
+            row += 1
+            occupied[row], left[row], right[row] = o, l, r
+            free[row] = full & ~(o | l | r)
+        self.row = row
+        return None
+
+
+def iter_solutions(size):
+    """Yield every solution as bytes, where solution[row] is the queen's column."""
+    cursor = SolutionCursor(size)
+    solution = cursor.next()
+    while solution is not None:
+        yield solution
+        solution = cursor.next()
+
+
+def symmetries(solution):
+    """The 8 images of a solution under the rotations and reflections of the board."""
+    size = len(solution)
+    last = size - 1
+    images = []
+    image = bytes(solution)
+    for _ in range(4):
+        images.append(image)
+        images.append(bytes(last - col for col in image))
+        # Rotate a quarter turn: the queen at (row, col) moves to (col, last - row).
+        rotated = bytearray(size)
+        for row, col in enumerate(image):
+            rotated[col] = last - row
+        image = bytes(rotated)
+    return images
+
+
+def orbit(solution):
+    """The distinct images of a solution, smallest first (1, 2, 4 or 8 of them)."""
+    return sorted(set(symmetries(solution)))
+
+
+def is_fundamental(solution):
+    """True if solution is the smallest of its images, the one kept per symmetry class."""
+    last = len(solution) - 1
+    first = solution[0]
+    # The first entries of the 8 images come from the queens on the top and
+    # bottom rows and in the left and right columns; most solutions lose
+    # there without building any image.
+    for col in (solution[last], solution.index(0), solution.index(last)):
+        if col < first or last - col < first:
+            return False
+    return min(symmetries(solution)) == bytes(solution)
+
+
+def iter_fundamental(size):
+    """Yield one solution per symmetry class: the smallest of its 8 images.
+
+    The smallest image has its top queen in the left half of the row
+    (mirroring moves it there otherwise), so only that half is searched.
+    """
+    cursor = SolutionCursor(size, first_row=(1 << ((size + 1) // 2)) - 1)
+    solution = cursor.next()
+    while solution is not None:
+        if is_fundamental(solution):
+            yield solution
+        solution = cursor.next()
+
+
+def iter_by_symmetry(size):
+    """Yield every solution, fundamental solutions first expanded into their images.
+
+    Same set as iter_solutions in a different order, grouped by symmetry class.
+    """
+    for solution in iter_fundamental(size):
+        yield from orbit(solution)
+
+
+def count_fundamental(size):
+    """Return (fundamental, total) solution counts."""
+    fundamental = total = 0
+    for solution in iter_fundamental(size):
+        fundamental += 1
+        total += len(orbit(solution))
+    return fundamental, total
+
+
+def count_from(size, occupied=0, left=0, right=0):
+    """Count the ways to finish a board whose filled top rows left these attack masks."""
+    full = (1 << size) - 1
+
+    def count(occupied, left, right):
+        if occupied == full:
+            return 1
+        total = 0
+        free = full & ~(occupied | left | right)
+        while free:
+            bit = free & -free
+            free ^= bit
+            total += count(occupied | bit, ((left | bit) << 1) & full, (right | bit) >> 1)
+        return total
+
+    return count(occupied, left, right)
+
+
+def split_prefixes(size, rows=1):
+    """Cut the count for size into independent pieces, one per placement of the top rows.
+
+    Returns (weight, occupied, left, right) tuples; the total is the sum of
+    weight * count_from(size, occupied, left, right). Only the left half of
+    the top row is used, with weight 2 for its mirror image (the middle
+    column of an odd board counts once).
+    """
+    if size < 1:
+        return []
+    full = (1 << size) - 1
+    rows = max(1, min(rows, size))
+    prefixes = []
+
+    def extend(weight, depth, occupied, left, right):
+        if depth == rows:
+            prefixes.append((weight, occupied, left, right))
+            return
+        free = full & ~(occupied | left | right)
+        while free:
+            bit = free & -free
+            free ^= bit
+            extend(weight, depth + 1, occupied | bit, ((left | bit) << 1) & full, (right | bit) >> 1)
+
+    half = size // 2
+    for col in range(half + size % 2):
+        bit = 1 << col
+        weight = 2 if col < half else 1
+        extend(weight, 1, bit, (bit << 1) & full, bit >> 1)
+    return prefixes
+
+
+def count_solutions(size):
+    """Count solutions without building them, searching half the top row (see split_prefixes)."""
+    return sum(weight * count_from(size, *masks) for weight, *masks in split_prefixes(size))
+
+
+class SolutionPager:
+    """Solutions produced on demand, keeping the most recent few for paging back.
+
+    With fundamental=True only one solution per symmetry class is produced;
+    otherwise each fundamental solution is followed by the rest of its images.
+
+    get(index) returns solution number index, enumerating forward as far as
+    needed. Indexes older than the window are rebuilt by restarting the
+    enumeration, which is only as slow as walking forward to them again.
+    """
+
+    def __init__(self, size, window=WINDOW, fundamental=False):
+        self.size = size
+        self.window_size = window
+        self.fundamental = fundamental
+        self.restart()
+
+    def restart(self):
+        self.source = iter_fundamental(self.size) if self.fundamental else iter_by_symmetry(self.size)
+        self.window = deque(maxlen=self.window_size)
+        self.produced = 0
+        self.exhausted = False
+
+    @property
+    def start(self):
+        """Index of the oldest solution still in the window."""
+        return self.produced - len(self.window)
+
+    def get(self, index):
+        """Return solution number index (from 0), or None if there are not that many."""
+        if index < 0:
+            return None
+        if index < self.start:
+            self.restart()
+        while self.produced <= index and not self.exhausted:
+            solution = next(self.source, None)
+            if solution is None:
+                self.exhausted = True
+            else:
+                self.window.append(solution)
+                self.produced += 1
+        if index >= self.produced:
+            return None
+        return self.window[index - self.start]
+
+
+class Solutions:
+    """Append-only list of solutions for one board size, packed into a single bytearray."""
+
+    def __init__(self, size, solutions=()):
+        self.size = size
+        self.data = bytearray()
+        for solution in solutions:
+            self.append(solution)
+
+    def append(self, solution):
+        self.data += solution
+
+    def __len__(self):
+        return len(self.data) // self.size if self.size else 0
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("solution index out of range")
+        start = index * self.size
+        return bytes(self.data[start:start + self.size])
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    @property
+    def nbytes(self):
+        return len(self.data)
+
+
+class QueenTracker:
+    """Queen counts per row, column, diagonal and anti-diagonal for the play board.
+
+    Wraps the 2D 0/1 board in place; toggle() keeps the counts, the number
+    of queens and the number of attacking pairs in sync, so validity,
+    conflicts and attacked squares are read off the counters instead of
+    rescanning the board.
+    """
+
+    def __init__(self, board):
+        self.board = board
+        self.size = size = len(board)
+        self.row_counts = [0] * size
+        self.col_counts = [0] * size
+        self.diag_counts = [0] * (2 * size - 1)
+        self.anti_counts = [0] * (2 * size - 1)
+        self.queens = 0
+        self.attacking_pairs = 0
+        for r in range(size):
+            for c in range(size):
+                if board[r][c]:
+                    self._add(r, c)
+
+    def _lines(self, row, col):
+        return (
+            (self.row_counts, row),
+            (self.col_counts, col),
+            (self.diag_counts, row + col),
+            (self.anti_counts, row - col + self.size - 1),
+        )
+
+    def _add(self, row, col):
+        for counts, index in self._lines(row, col):
+            self.attacking_pairs += counts[index]
+            counts[index] += 1
+        self.queens += 1
+
+    def _remove(self, row, col):
+        for counts, index in self._lines(row, col):
+            counts[index] -= 1
+            self.attacking_pairs -= counts[index]
+        self.queens -= 1
+
+    def toggle(self, row, col):
+        """Add or remove the queen on a square and update the counts."""
+        if self.board[row][col]:
+            self.board[row][col] = 0
+            self._remove(row, col)
+        else:
+            self.board[row][col] = 1
+            self._add(row, col)
+
+    def attackers(self, row, col):
+        """Number of queens attacking a square, not counting a queen standing on it."""
+        own = 1 if self.board[row][col] else 0
+        return sum(counts[index] - own for counts, index in self._lines(row, col))
+
+    def is_attacked(self, row, col):
+        return self.attackers(row, col) > 0
+
+    @property
+    def has_conflicts(self):
+        return self.attacking_pairs > 0
+
+    @property
+    def is_solved(self):
+        return self.queens == self.size and not self.attacking_pairs
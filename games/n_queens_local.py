@@ -0,0 +1,154 @@
+# games/n_queens_local.py
+#
+# One N-Queens solution for boards far beyond backtracking (N in the
+# thousands to hundreds of thousands) by min-conflicts local search.
+# Queens stay one per row; NumPy arrays count the queens on every column,
+# diagonal (row + col) and anti-diagonal (row - col), so moving a queen is
+# six counter updates and scoring every column of a row is one vector sum.
+#
+# A greedy start places each row's queen on a random column whose column
+# and diagonals are still empty where it can find one, which leaves only a
+# handful of conflicts; min-conflicts then repeatedly moves a conflicted
+# queen to the least-attacked column of its row until none are left.
+
+import time
+
+import numpy as np
+
+INIT_TRIES = 32
+MAX_STEPS_PER_QUEEN = 2
+
+
+class LocalSearch:
+    """Min-conflicts state for one board: queen columns plus attack counters."""
+
+    def __init__(self, size, rng=None):
+        self.size = size
+        self.rng = rng or np.random.default_rng()
+        self.cols = self.greedy_start()
+        rows = np.arange(size)
+        self.col_count = np.bincount(self.cols, minlength=size)
+        self.diag_count = np.bincount(rows + self.cols, minlength=2 * size - 1)
+        self.anti_count = np.bincount(rows - self.cols + size - 1, minlength=2 * size - 1)
+        self.steps = 0
+
+    def greedy_start(self):
+        """A permutation drawn row by row, preferring columns with free diagonals."""
+        size = self.size
+        remaining = self.rng.permutation(size).tolist()
+        diag = bytearray(2 * size - 1)
+        anti = bytearray(2 * size - 1)
+        cols = []
+        randrange = self.rng.integers
+        for row in range(size):
+            left = len(remaining)
+            pick = left - 1
+            for _ in range(min(INIT_TRIES, left)):
+                index = int(randrange(left))
+                col = remaining[index]
+                if not diag[row + col] and not anti[row - col + size - 1]:
+                    pick = index
+                    break
+            remaining[pick], remaining[-1] = remaining[-1], remaining[pick]
+            col = remaining.pop()
+            diag[row + col] = 1
+            anti[row - col + size - 1] = 1
+            cols.append(col)
+        return np.array(cols, dtype=np.int64)
+
+    def conflicts(self):
+        """Number of other queens attacking each row's queen."""
+        rows = np.arange(self.size)
+        return (
+            self.col_count[self.cols]
+            + self.diag_count[rows + self.cols]
+            + self.anti_count[rows - self.cols + self.size - 1]
+            - 3
+        )
+
+    def move(self, row):
+        """Move row's queen to a least-attacked column of its row."""
+        size = self.size
+        col = self.cols[row]
+        self.col_count[col] -= 1
+        self.diag_count[row + col] -= 1
+        self.anti_count[row - col + size - 1] -= 1
+        # Column c of this row lies on diagonal row + c and anti-diagonal row - c + size - 1.
+        costs = (
+            self.col_count
+            + self.diag_count[row:row + size]
+            + self.anti_count[row:row + size][::-1]
+        )
+        best = np.flatnonzero(costs == costs.min())
+        col = int(best[self.rng.integers(len(best))])
+        self.cols[row] = col
+        self.col_count[col] += 1
+        self.diag_count[row + col] += 1
+        self.anti_count[row - col + size - 1] += 1
+        self.steps += 1
+
+    def solve(self, max_steps, stop=None):
+        """Repair conflicts until none are left; returns False if max_steps ran out or stop was set."""
+        while self.steps < max_steps and not (stop is not None and stop.is_set()):
+            conflicted = np.flatnonzero(self.conflicts())
+            if not len(conflicted):
+                return True
+            for row in self.rng.permutation(conflicted):
+                self.move(int(row))
+        return False
+
+
+def min_conflicts(size, rng=None, max_restarts=10, stop=None):
+    """Return (cols, stats) for one solution, where cols[row] is the queen's column.
+
+    stats holds the repair steps, restarts and seconds taken. Raises
+    ValueError for sizes with no solution (2 and 3). If the optional stop
+    event is set first, the search gives up and returns (None, stats).
+    """
+    if size in (2, 3) or size < 1:
+        raise ValueError(f"there is no way to place {size} queens on a {size}x{size} board")
+    start = time.perf_counter()
+    rng = rng or np.random.default_rng()
+    for restart in range(max_restarts + 1):
+        search = LocalSearch(size, rng)
+        solved = search.solve(MAX_STEPS_PER_QUEEN * size + 100, stop)
+        if solved or (stop is not None and stop.is_set()):
+            return search.cols if solved else None, {
+                'steps': search.steps,
+                'restarts': restart,
+                'seconds': time.perf_counter() - start,
+            }
+    raise RuntimeError(f"min-conflicts found no solution for N={size} in {max_restarts + 1} attempts")
+
+
+def is_solution(cols):
+    """Check a placement with one queen per row, vectorized."""
+    cols = np.asarray(cols)
+    size = len(cols)
+    rows = np.arange(size)
+    return (
+        len(np.unique(cols)) == size
+        and len(np.unique(rows + cols)) == size
+        and len(np.unique(rows - cols)) == size
+    )
+
+
+def board_image(cols, max_pixels=600):
+    """Render a placement as a grayscale image array.
+
+    Boards up to max_pixels wide are drawn square by square (checkerboard
+    plus black queens), scaled up by a whole factor to fill the width;
+    larger boards are binned down to max_pixels and each bin holding a
+    queen is drawn black.
+    """
+    cols = np.asarray(cols)
+    size = len(cols)
+    rows = np.arange(size)
+    if size <= max_pixels:
+        image = np.where((rows[:, None] + rows[None, :]) % 2 == 0, 235, 170).astype(np.uint8)
+        image[rows, cols] = 0
+        scale = max_pixels // size
+        return image.repeat(scale, axis=0).repeat(scale, axis=1)
+    image = np.full((max_pixels, max_pixels), 255, dtype=np.uint8)
+    image[rows * max_pixels // size, cols * max_pixels // size] = 0
+    return image
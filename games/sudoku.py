@@ -1,8 +1,10 @@
 # games/sudoku.py
 
 import streamlit as st
-import random
+import math
 import time
+from games.sudoku_engine import BOX_SIZES, DIFFICULTIES, BoardState, SearchLimitReached, flatten, unflatten, solve_cells, generate_puzzle
+from games.sudoku_hints import CandidateGrid, find_hint
 
 def render_sudoku():
     st.title("Sudoku Solver & Player")
@@ -13,11 +15,20 @@ def render_sudoku():
 
     game_state = st.session_state.games['sudoku']
 
-    colA, colB = st.columns(2)
+    difficulty = st.selectbox("Difficulty", DIFFICULTIES, index=DIFFICULTIES.index(game_state.get('difficulty', 'Medium')))
+    size_labels = {f"{box * box}×{box * box}": box for box in BOX_SIZES}
+    box = size_labels[st.selectbox("Board size", list(size_labels), index=BOX_SIZES.index(game_state.get('box', 3)))]
+
+    colA, colB, colC = st.columns(3)
     with colA:
         if st.button("🔁 New Game"):
-            game_state['board'] = generate_sudoku()
+            game_state['board'], game_state['grade'] = generate_sudoku(difficulty, box)
+            game_state['difficulty'] = difficulty
+            game_state['box'] = box
             game_state['original'] = [row[:] for row in game_state['board']]
+            game_state['tracker'] = BoardState(game_state['board'])
+            game_state['candidates'] = CandidateGrid(game_state['tracker'])
+            game_state['hint'] = None
             game_state['solution'] = None
             st.session_state.game_start_time = time.time()
             st.rerun()
@@ -25,17 +36,51 @@ def render_sudoku():
     with colB:
         if st.button("🧠 Solve"):
             game_state['solution'] = [row[:] for row in game_state['board']]
-            if solve_sudoku(game_state['solution']):
-                st.success("Sudoku solved successfully!")
+            try:
+                solved = solve_sudoku(game_state['solution'])
+            except SearchLimitReached:
+                game_state['solution'] = None
+                st.warning("The solver gave up on this board. Fill in a few more cells and try again.")
             else:
-                st.error("No solution exists.")
+                if solved:
+                    st.success("Sudoku solved successfully!")
+                else:
+                    st.error("No solution exists.")
 
     if game_state['board'] is None or game_state['original'] is None:
         st.warning("Click 'New Game' to start playing.")
         return
 
+    tracker = game_state.get('tracker')
+    if tracker is None or tracker.board is not game_state['board']:
+        tracker = game_state['tracker'] = BoardState(game_state['board'])
+    candidates = game_state.get('candidates')
+    if candidates is None or candidates.tracker is not tracker:
+        candidates = game_state['candidates'] = CandidateGrid(tracker)
+
+    with colC:
+        if st.button("💡 Hint"):
+            game_state['hint'] = find_hint(candidates)
+            if game_state['hint'] is None:
+                st.info("No logical step found with the techniques the hint engine knows.")
+            else:
+                candidates.apply(game_state['hint'])
+
+    hint = game_state.get('hint')
+
+    if game_state.get('grade'):
+        st.caption(f"Puzzle grade: {game_state['grade']}")
+
     st.subheader("🎮 Current Board:")
-    display_sudoku_board(game_state['board'], game_state['original'])
+    display_sudoku_board(game_state['board'], game_state['original'], tracker, hint)
+
+    if hint:
+        st.info(f"💡 {hint['technique']}: {hint['message']}")
+
+    if tracker.is_solved:
+        st.success("🎉 You solved the puzzle!")
+    elif tracker.has_conflicts:
+        st.warning("Some numbers clash with their row, column or box.")
 
     if game_state['solution']:
         st.subheader("✅ Solution:")
@@ -44,101 +89,98 @@ def render_sudoku():
     st.markdown("---")
     st.subheader("✍️ Make a Move")
 
+    size = len(game_state['board'])
     col1, col2, col3 = st.columns(3)
     with col1:
-        row = st.selectbox("Row", range(1, 10)) - 1
+        row = st.selectbox("Row", range(1, size + 1)) - 1
     with col2:
-        col = st.selectbox("Column", range(1, 10)) - 1
+        col = st.selectbox("Column", range(1, size + 1)) - 1
     with col3:
-        value = st.selectbox("Value (0 to clear)", range(0, 10))
+        value = st.selectbox("Value (0 to clear)", range(0, size + 1))
 
     if st.button("📥 Place Number"):
         if game_state['original'][row][col] != 0:
             st.error("You can't modify original numbers!")
         else:
-            game_state['board'][row][col] = value
+            candidates.place(row, col, value)
+            game_state['hint'] = None
             st.rerun()
 
     display_game_time()
 
 # --- Sudoku Logic ---
 
-def generate_sudoku():
-    board = [[0 for _ in range(9)] for _ in range(9)]
-    solve_sudoku(board)
-    for _ in range(40):
-        row, col = random.randint(0, 8), random.randint(0, 8)
-        while board[row][col] == 0:
-            row, col = random.randint(0, 8), random.randint(0, 8)
-        board[row][col] = 0
-    return board
+def generate_sudoku(difficulty="Medium", box=3):
+    puzzle, _, grade = generate_puzzle(difficulty, box=box)
+    return unflatten(puzzle), grade
 
 def solve_sudoku(board):
-    empty = find_empty_cell(board)
-    if not empty:
-        return True
-    row, col = empty
-
-    for num in range(1, 10):
-        if is_valid(board, row, col, num):
-            board[row][col] = num
-            if solve_sudoku(board):
-                return True
-            board[row][col] = 0
-    return False
-
-def find_empty_cell(board):
-    for i in range(9):
-        for j in range(9):
-            if board[i][j] == 0:
-                return i, j
-    return None
+    cells = solve_cells(flatten(board))
+    if cells is None:
+        return False
+    for i, row in enumerate(unflatten(cells)):
+        board[i][:] = row
+    return True
 
 def is_valid(board, row, col, num):
+    size = len(board)
+    box = math.isqrt(size)
     if num in board[row]: return False
-    if num in [board[i][col] for i in range(9)]: return False
-    box_row, box_col = 3 * (row // 3), 3 * (col // 3)
-    for i in range(box_row, box_row + 3):
-        for j in range(box_col, box_col + 3):
+    if num in [board[i][col] for i in range(size)]: return False
+    box_row, box_col = box * (row // box), box * (col // box)
+    for i in range(box_row, box_row + box):
+        for j in range(box_col, box_col + box):
             if board[i][j] == num:
                 return False
     return True
 
-def display_sudoku_board(board, original):
-    html = """
+def display_sudoku_board(board, original, tracker=None, hint=None):
+    size = len(board)
+    hint_cells = set(hint['cells']) if hint else set()
+    related_cells = set(hint['related']) if hint else set()
+    box = math.isqrt(size)
+    cell = {9: 50, 16: 36, 25: 28}.get(size, 28)
+    html = f"""
     <style>
-    .sudoku-grid {
+    .sudoku-grid {{
         display: grid;
-        grid-template-columns: repeat(9, 50px);
+        grid-template-columns: repeat({size}, {cell}px);
         border: 3px solid black;
-    }
-    .sudoku-cell {
-        width: 50px;
-        height: 50px;
+        width: max-content;
+    }}
+    .sudoku-cell {{
+        width: {cell}px;
+        height: {cell}px;
         display: flex;
         justify-content: center;
         align-items: center;
-        font-size: 20px;
+        font-size: {cell * 2 // 5}px;
         font-family: monospace;
         color: #000000;
         border: 1px solid #999;
-    }
+    }}
     </style>
     <div class="sudoku-grid">
     """
-    for i in range(9):
-        for j in range(9):
+    for i in range(size):
+        for j in range(size):
             value = board[i][j] if board[i][j] != 0 else ""
             bg = "#f8f8f8" if original is None or original[i][j] == 0 else "#cccccc"
+            if (i, j) in related_cells:
+                bg = "#fff4c2"
+            if (i, j) in hint_cells:
+                bg = "#ffd966"
+            if tracker is not None and tracker.is_conflict(i, j):
+                bg = "#f4a6a6"
             weight = "bold" if original and original[i][j] != 0 else "normal"
             border_style = ""
-            if j % 3 == 0:
+            if j % box == 0:
                 border_style += "border-left: 3px solid black;"
-            if i % 3 == 0:
+            if i % box == 0:
                 border_style += "border-top: 3px solid black;"
-            if j == 8:
+            if j == size - 1:
                 border_style += "border-right: 3px solid black;"
-            if i == 8:
+            if i == size - 1:
                 border_style += "border-bottom: 3px solid black;"
             html += f"<div class='sudoku-cell' style='background-color: {bg}; font-weight: {weight}; {border_style}'>{value}</div>"
     html += "</div>"
@@ -0,0 +1,131 @@
+# games/sudoku_batch.py
+#
+# Headless batch solver for puzzle banks. Reads one puzzle per line in the
+# usual 81-character format (digits, with 0 or . for blanks) from a file or
+# stdin, solves them on a process pool in chunks and streams the results
+# back out in input order:
+#
+#     python -m games.sudoku_batch puzzles.txt > solved.txt
+#     cat puzzles.txt | python -m games.sudoku_batch --workers 8
+#
+# Each output line is "<puzzle> <solution> <milliseconds>", where the
+# solution is "invalid" for malformed lines, "unsolvable" when the puzzle
+# has no solution and "gave-up" when the solver's search budget ran out.
+# Only a bounded number of chunks is in flight at any time, so memory stays
+# flat however long the input is.
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from games.sudoku_engine import SIZE, SearchLimitReached, solve_cells
+
+CELLS = SIZE * SIZE
+# Only ASCII digits; str.isdigit() would also let through characters like '²' that int() rejects.
+DIGITS = "123456789"
+
+
+def parse_line(line):
+    """Turn an 81-character puzzle line into flat cells, or None if malformed."""
+    if len(line) != CELLS:
+        return None
+    cells = []
+    for ch in line:
+        if ch in ".0":
+            cells.append(0)
+        elif ch in DIGITS:
+            cells.append(int(ch))
+        else:
+            return None
+    return cells
+
+
+def solve_line(line):
+    start = time.perf_counter()
+    cells = parse_line(line)
+    if cells is None:
+        result = "invalid"
+    else:
+        try:
+            solution = solve_cells(cells)
+        except SearchLimitReached:
+            result = "gave-up"
+        else:
+            result = "unsolvable" if solution is None else "".join(map(str, solution))
+    return result, time.perf_counter() - start
+
+
+def solve_chunk(lines):
+    return [solve_line(line) for line in lines]
+
+
+def read_puzzles(stream):
+    for line in stream:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def solve_stream(lines, workers=None, chunk_size=256, max_pending=None):
+    """Yield (puzzle, solution, seconds) for every line, in input order.
+
+    Chunks are submitted to the pool as results are consumed, keeping at
+    most max_pending chunks (two per worker by default) in flight.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunked(lines, chunk_size):
+            pending.append((chunk, pool.submit(solve_chunk, chunk)))
+            if len(pending) >= max_pending:
+                chunk, future = pending.popleft()
+                yield from zip_results(chunk, future.result())
+        while pending:
+            chunk, future = pending.popleft()
+            yield from zip_results(chunk, future.result())
+
+
+def zip_results(chunk, results):
+    for line, (solution, seconds) in zip(chunk, results):
+        yield line, solution, seconds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve a file of Sudoku puzzles, one per line.")
+    parser.add_argument("input", nargs="?", default="-", help="puzzle file, or - for stdin (default)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=256, help="puzzles per task sent to a worker")
+    args = parser.parse_args(argv)
+
+    stream = sys.stdin if args.input == "-" else open(args.input)
+    total = solved = 0
+    start = time.perf_counter()
+    try:
+        for line, solution, seconds in solve_stream(read_puzzles(stream), args.workers, args.chunk_size):
+            sys.stdout.write(f"{line} {solution} {seconds * 1000:.3f}\n")
+            total += 1
+            solved += solution not in ("invalid", "unsolvable", "gave-up")
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    elapsed = time.perf_counter() - start
+    rate = total / elapsed if elapsed else 0.0
+    print(f"{solved}/{total} solved in {elapsed:.2f}s ({rate:.0f} puzzles/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
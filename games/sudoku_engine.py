@@ -0,0 +1,932 @@
+# games/sudoku_engine.py
+#
+# Bitmask constraint-propagation engine behind games/sudoku.py. Boards are
+# kept as a flat list of ints, and each row, column and box keeps a bitmask
+# of the digits it already holds (bit d-1 set means digit d is used), so the
+# candidates of a cell are three ORs away instead of a rescan of the grid.
+# Any N^2 x N^2 board works: 9x9 (box 3), 16x16 (box 4), 25x25 (box 5).
+# Sparse large boards that backtracking cannot crack quickly fall through to
+# a clause-learning search over (cell, digit) variables.
+
+import heapq
+import math
+import random
+import time
+from functools import lru_cache
+
+BOX = 3
+SIZE = BOX * BOX
+BOX_SIZES = (3, 4, 5)
+BACKTRACK_NODES = 500
+CONFLICT_LIMIT = 5000
+
+
+class Geometry:
+    """Index tables for one board size, shared by every solver of that size."""
+
+    def __init__(self, box):
+        size = box * box
+        self.box = box
+        self.size = size
+        self.cells = size * size
+        self.all_digits = (1 << size) - 1
+        self.row_of = [i // size for i in range(self.cells)]
+        self.col_of = [i % size for i in range(self.cells)]
+        self.box_of = [(r // box) * box + c // box for r, c in zip(self.row_of, self.col_of)]
+        self.coords = list(zip(self.row_of, self.col_of, self.box_of))
+        self.units = (
+            [[r * size + c for c in range(size)] for r in range(size)]
+            + [[r * size + c for r in range(size)] for c in range(size)]
+            + [[i for i in range(self.cells) if self.box_of[i] == b] for b in range(size)]
+        )
+        self.peers = [
+            sorted(set(self.units[r] + self.units[size + c] + self.units[2 * size + b]) - {i})
+            for i, (r, c, b) in enumerate(self.coords)
+        ]
+
+
+@lru_cache(maxsize=None)
+def geometry(box=BOX):
+    return Geometry(box)
+
+
+def box_for_cells(n_cells):
+    """Return the box size of a flat board with n_cells cells, or None."""
+    box = math.isqrt(math.isqrt(n_cells))
+    return box if box >= 2 and box ** 4 == n_cells else None
+
+
+def bit_count(mask):
+    return bin(mask).count("1")
+
+
+def flatten(board):
+    return [value for row in board for value in row]
+
+
+def unflatten(cells):
+    size = math.isqrt(len(cells))
+    return [cells[r * size:(r + 1) * size] for r in range(size)]
+
+
+class SearchLimitReached(Exception):
+    """Raised inside a search once its node or conflict budget is spent."""
+
+
+class BitmaskSolver:
+    """Depth-first search over a flat grid with MRV and single propagation.
+
+    Placed digits are tracked in per-row, per-column and per-box masks that
+    are updated incrementally by place() and unplace(); every branch keeps a
+    trail of the cells it filled so backtracking only undoes its own work.
+    """
+
+    def __init__(self, cells, rng=None):
+        self.cells = list(cells)
+        self.rng = rng
+        self.nodes = 0
+        self.node_limit = None
+        box = box_for_cells(len(self.cells))
+        self.valid = box is not None
+        geo = self.geo = geometry(box or BOX)
+        self.row_of, self.col_of, self.box_of = geo.row_of, geo.col_of, geo.box_of
+        self.all_digits = geo.all_digits
+        self.rows = [0] * geo.size
+        self.cols = [0] * geo.size
+        self.boxes = [0] * geo.size
+        if not self.valid:
+            return
+        for i, value in enumerate(self.cells):
+            if not 0 <= value <= geo.size:
+                self.valid = False
+            elif value:
+                bit = 1 << (value - 1)
+                if self.candidates(i) & bit:
+                    self.place(i, bit)
+                else:
+                    self.valid = False
+
+    def candidates(self, i):
+        return self.all_digits & ~(self.rows[self.row_of[i]] | self.cols[self.col_of[i]] | self.boxes[self.box_of[i]])
+
+    def place(self, i, bit):
+        self.cells[i] = bit.bit_length()
+        self.rows[self.row_of[i]] |= bit
+        self.cols[self.col_of[i]] |= bit
+        self.boxes[self.box_of[i]] |= bit
+
+    def unplace(self, i):
+        bit = ~(1 << (self.cells[i] - 1))
+        self.cells[i] = 0
+        self.rows[self.row_of[i]] &= bit
+        self.cols[self.col_of[i]] &= bit
+        self.boxes[self.box_of[i]] &= bit
+
+    def undo(self, trail):
+        for i in trail:
+            self.unplace(i)
+
+    def fill_naked_singles(self, trail):
+        """Place every cell that has exactly one candidate left.
+
+        Returns the number of cells filled, or -1 if some cell has no
+        candidates at all.
+        """
+        cells = self.cells
+        rows, cols, boxes = self.rows, self.cols, self.boxes
+        all_digits = self.all_digits
+        filled = 0
+        for i, (r, c, b) in enumerate(self.geo.coords):
+            if cells[i]:
+                continue
+            cand = all_digits & ~(rows[r] | cols[c] | boxes[b])
+            if not cand:
+                return -1
+            if cand & (cand - 1) == 0:
+                self.place(i, cand)
+                trail.append(i)
+                filled += 1
+        return filled
+
+    def fill_hidden_singles(self, trail):
+        """Place every digit that fits in only one cell of some unit.
+
+        Returns the number of cells filled, or -1 if a unit has a digit with
+        nowhere left to go.
+        """
+        cells = self.cells
+        rows, cols, boxes = self.rows, self.cols, self.boxes
+        coords = self.geo.coords
+        all_digits = self.all_digits
+        filled = 0
+        for unit in self.geo.units:
+            once = twice = placed = 0
+            for i in unit:
+                if cells[i]:
+                    placed |= 1 << (cells[i] - 1)
+                    continue
+                r, c, b = coords[i]
+                cand = all_digits & ~(rows[r] | cols[c] | boxes[b])
+                twice |= once & cand
+                once |= cand
+            if (once | placed) != all_digits:
+                return -1
+            hidden = once & ~twice & ~placed
+            while hidden:
+                bit = hidden & -hidden
+                hidden ^= bit
+                for i in unit:
+                    if not cells[i] and self.candidates(i) & bit:
+                        self.place(i, bit)
+                        trail.append(i)
+                        filled += 1
+                        break
+                else:
+                    return -1
+        return filled
+
+    def propagate(self, trail):
+        """Fill naked and hidden singles until nothing changes.
+
+        Returns False as soon as the grid runs into a contradiction.
+        """
+        while True:
+            naked = self.fill_naked_singles(trail)
+            if naked < 0:
+                return False
+            hidden = self.fill_hidden_singles(trail)
+            if hidden < 0:
+                return False
+            if not naked and not hidden:
+                return True
+
+    def most_constrained(self):
+        """Return (cell, candidates) for the empty cell with fewest candidates."""
+        best, best_cand, best_count = None, 0, self.geo.size + 1
+        for i in range(self.geo.cells):
+            if self.cells[i]:
+                continue
+            cand = self.candidates(i)
+            count = bit_count(cand)
+            if count < best_count:
+                best, best_cand, best_count = i, cand, count
+                if count <= 1:
+                    break
+        return best, best_cand
+
+    def pair_in_unit(self):
+        """Return the two cells of some unit that are the only homes for a digit.
+
+        Returns (bit, cell_a, cell_b), or None when no digit is down to two
+        places anywhere.
+        """
+        cells = self.cells
+        for unit in self.geo.units:
+            once = twice = thrice = 0
+            for i in unit:
+                if not cells[i]:
+                    cand = self.candidates(i)
+                    thrice |= twice & cand
+                    twice |= once & cand
+                    once |= cand
+            pairs = twice & ~thrice
+            if pairs:
+                bit = pairs & -pairs
+                a, b = [i for i in unit if not cells[i] and self.candidates(i) & bit]
+                return bit, a, b
+        return None
+
+    def branches(self):
+        """Return the (cell, bit) alternatives to try next, or None if solved.
+
+        Branches on the cell with fewest candidates, or on the two homes of
+        a digit within a unit when that is the narrower choice, which is
+        what keeps 16x16 and 25x25 searches shallow.
+        """
+        i, cand = self.most_constrained()
+        if i is None:
+            return None
+        if bit_count(cand) > 2:
+            pair = self.pair_in_unit()
+            if pair is not None:
+                bit, a, b = pair
+                options = [(a, bit), (b, bit)]
+                if self.rng is not None:
+                    self.rng.shuffle(options)
+                return options
+        return [(i, bit) for bit in self.branch_order(cand)]
+
+    def search(self):
+        self.nodes += 1
+        if self.node_limit is not None and self.nodes > self.node_limit:
+            raise SearchLimitReached
+        trail = []
+        if not self.propagate(trail):
+            self.undo(trail)
+            return False
+        options = self.branches()
+        if options is None:
+            return True
+        for i, bit in options:
+            self.place(i, bit)
+            if self.search():
+                return True
+            self.unplace(i)
+        self.undo(trail)
+        return False
+
+    def count(self, limit):
+        """Count solutions below the current node, stopping at limit."""
+        trail = []
+        if not self.propagate(trail):
+            self.undo(trail)
+            return 0
+        options = self.branches()
+        if options is None:
+            self.undo(trail)
+            return 1
+        total = 0
+        for i, bit in options:
+            self.place(i, bit)
+            total += self.count(limit - total)
+            self.unplace(i)
+            if total >= limit:
+                break
+        self.undo(trail)
+        return total
+
+    def branch_order(self, cand):
+        bits = []
+        while cand:
+            bit = cand & -cand
+            cand ^= bit
+            bits.append(bit)
+        if self.rng is not None:
+            self.rng.shuffle(bits)
+        return bits
+
+    def solve(self):
+        return self.valid and self.search()
+
+
+class _Conflict(Exception):
+    """Raised inside LearningSolver propagation when an assignment contradicts the board."""
+
+
+class LearningSolver:
+    """Conflict-driven clause learning for boards that plain backtracking thrashes on.
+
+    Every (cell, digit) pair is a boolean variable, v = cell * size + digit - 1.
+    Propagation finds the same naked and hidden singles as BitmaskSolver but
+    records why each variable was set, so a contradiction can be traced back
+    to the decisions behind it and turned into a learned clause that keeps
+    ruling that combination out for the rest of the search, restarts
+    included. Decisions go to the variables most involved in recent
+    conflicts (VSIDS), kept in a lazily updated heap.
+
+    Literals are 2 * v for "v is true" and 2 * v + 1 for "v is false".
+    Reasons are tuples: ("given",), ("decision",), ("placed", v) for an
+    elimination caused by placing v, ("cell",) and ("unit", u) for naked and
+    hidden singles, and ("clause", literals) for a learned clause.
+    """
+
+    RESTART_CONFLICTS = 50
+    RESTART_GROWTH = 1.5
+    ACTIVITY_GROWTH = 1.05
+
+    def __init__(self, cells):
+        box = box_for_cells(len(cells))
+        geo = self.geo = geometry(box or BOX)
+        size = self.size = geo.size
+        self.units = geo.units
+        self.peers = geo.peers
+        self.units_of = [(r, size + c, 2 * size + b) for r, c, b in geo.coords]
+        n_vars = geo.cells * size
+        self.value = [0] * n_vars  # 1 true, -1 false, 0 open
+        self.level = [0] * n_vars
+        self.reason = [None] * n_vars
+        self.activity = [0.0] * n_vars
+        self.bump_by = 1.0
+        self.cand = [geo.all_digits] * geo.cells
+        self.placed = [0] * geo.cells
+        # Open homes of digit d in unit u, at u * size + d.
+        self.homes = [size] * (3 * size * size)
+        self.trail = []
+        self.level_starts = []
+        self.head = 0
+        self.watches = {}
+        self.conflict = None
+        self.conflicts = 0
+        self.valid = box is not None
+        if self.valid:
+            try:
+                for i, value in enumerate(cells):
+                    if not 0 <= value <= size:
+                        raise _Conflict
+                    if value:
+                        self.set_true(i * size + value - 1, ("given",))
+                self.propagate()
+            except _Conflict:
+                self.valid = False
+        # Until conflicts say otherwise, prefer cells with few candidates.
+        for v in range(n_vars):
+            if not self.value[v]:
+                self.activity[v] = 1.0 / bit_count(self.cand[v // size])
+        self.heap = [(-self.activity[v], v) for v in range(n_vars) if not self.value[v]]
+        heapq.heapify(self.heap)
+
+    def set_true(self, v, reason):
+        if self.value[v] == 1:
+            return
+        if self.value[v] == -1:
+            self.conflict = [v] + self.antecedents(v, reason)
+            raise _Conflict
+        self.value[v] = 1
+        self.level[v] = len(self.level_starts)
+        self.reason[v] = reason
+        self.placed[v // self.size] = v % self.size + 1
+        self.trail.append(v)
+
+    def set_false(self, v, reason):
+        if self.value[v] == -1:
+            return
+        if self.value[v] == 1:
+            self.conflict = [v] + self.antecedents(v, reason)
+            raise _Conflict
+        size = self.size
+        i, d = divmod(v, size)
+        self.value[v] = -1
+        self.level[v] = len(self.level_starts)
+        self.reason[v] = reason
+        self.cand[i] &= ~(1 << d)
+        for u in self.units_of[i]:
+            self.homes[u * size + d] -= 1
+        self.trail.append(v)
+
+    def set_literal(self, lit, reason):
+        if lit & 1:
+            self.set_false(lit >> 1, reason)
+        else:
+            self.set_true(lit >> 1, reason)
+
+    def literal_value(self, lit):
+        value = self.value[lit >> 1]
+        return -value if lit & 1 else value
+
+    def antecedents(self, v, reason):
+        """Return the variables whose assignments forced v's assignment."""
+        kind = reason[0]
+        size = self.size
+        i, d = divmod(v, size)
+        if kind == "placed":
+            return [reason[1]]
+        if kind == "cell":
+            return [i * size + e for e in range(size) if e != d]
+        if kind == "unit":
+            return [j * size + d for j in self.units[reason[1]] if j != i]
+        if kind == "clause":
+            return [lit >> 1 for lit in reason[1] if lit >> 1 != v]
+        return []
+
+    def propagate(self):
+        """Work through the trail until nothing more is forced.
+
+        Raises _Conflict, with self.conflict set to variables that cannot
+        all keep their current values, on a contradiction.
+        """
+        size = self.size
+        trail = self.trail
+        value = self.value
+        cand = self.cand
+        homes = self.homes
+        while self.head < len(trail):
+            v = trail[self.head]
+            self.head += 1
+            i, d = divmod(v, size)
+            if value[v] == 1:
+                bit = 1 << d
+                reason = ("placed", v)
+                others = cand[i] & ~bit
+                while others:
+                    low = others & -others
+                    others ^= low
+                    self.set_false(i * size + low.bit_length() - 1, reason)
+                for j in self.peers[i]:
+                    if cand[j] & bit:
+                        self.set_false(j * size + d, reason)
+                false_lit = 2 * v + 1
+            else:
+                if not cand[i]:
+                    self.conflict = [i * size + e for e in range(size)]
+                    raise _Conflict
+                if not cand[i] & (cand[i] - 1) and not self.placed[i]:
+                    self.set_true(i * size + cand[i].bit_length() - 1, ("cell",))
+                for u in self.units_of[i]:
+                    left = homes[u * size + d]
+                    if left > 1:
+                        continue
+                    if not left:
+                        self.conflict = [j * size + d for j in self.units[u]]
+                        raise _Conflict
+                    for j in self.units[u]:
+                        if value[j * size + d] >= 0:
+                            if not value[j * size + d]:
+                                self.set_true(j * size + d, ("unit", u))
+                            break
+                false_lit = 2 * v
+            if false_lit in self.watches:
+                self.update_watches(false_lit)
+
+    def update_watches(self, false_lit):
+        """Visit the learned clauses watching a literal that just became false.
+
+        Each clause watches its first two literals. A clause that finds no
+        other unfalsified literal to watch either forces its other watch or,
+        if that is false too, is the conflict.
+        """
+        watching = self.watches[false_lit]
+        keep = []
+        k = 0
+        try:
+            while k < len(watching):
+                clause = watching[k]
+                k += 1
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if self.literal_value(clause[0]) == 1:
+                    keep.append(clause)
+                    continue
+                for m in range(2, len(clause)):
+                    if self.literal_value(clause[m]) != -1:
+                        clause[1], clause[m] = clause[m], clause[1]
+                        self.watches.setdefault(clause[1], []).append(clause)
+                        break
+                else:
+                    keep.append(clause)
+                    if self.literal_value(clause[0]) == -1:
+                        self.conflict = [lit >> 1 for lit in clause]
+                        raise _Conflict
+                    self.set_literal(clause[0], ("clause", clause))
+        finally:
+            keep.extend(watching[k:])
+            self.watches[false_lit] = keep
+
+    def cancel_until(self, level):
+        """Undo every assignment made above the given decision level."""
+        if len(self.level_starts) <= level:
+            return
+        size = self.size
+        trail = self.trail
+        stop = self.level_starts[level]
+        while len(trail) > stop:
+            v = trail.pop()
+            i, d = divmod(v, size)
+            if self.value[v] == 1:
+                self.placed[i] = 0
+            else:
+                self.cand[i] |= 1 << d
+                for u in self.units_of[i]:
+                    self.homes[u * size + d] += 1
+            self.value[v] = 0
+            self.reason[v] = None
+            heapq.heappush(self.heap, (-self.activity[v], v))
+        del self.level_starts[level:]
+        self.head = len(trail)
+
+    def true_literal(self, v):
+        return 2 * v if self.value[v] == 1 else 2 * v + 1
+
+    def analyze(self):
+        """Learn a clause from self.conflict (first unique implication point).
+
+        Returns (clause, level to jump back to). The first literal of the
+        clause is the one it forces once the search is back at that level.
+        """
+        current = len(self.level_starts)
+        seen = set()
+        learnt = [None]
+        open_here = 0
+        pending = self.conflict
+        index = len(self.trail) - 1
+        while True:
+            for q in pending:
+                if q in seen:
+                    continue
+                seen.add(q)
+                self.bump(q)
+                if self.level[q] == current:
+                    open_here += 1
+                elif self.level[q] > 0:
+                    learnt.append(self.true_literal(q) ^ 1)
+            while self.trail[index] not in seen:
+                index -= 1
+            p = self.trail[index]
+            index -= 1
+            open_here -= 1
+            if not open_here:
+                break
+            pending = self.antecedents(p, self.reason[p])
+        learnt[0] = self.true_literal(p) ^ 1
+        if len(learnt) == 1:
+            return learnt, 0
+        top = max(range(1, len(learnt)), key=lambda k: self.level[learnt[k] >> 1])
+        learnt[1], learnt[top] = learnt[top], learnt[1]
+        return learnt, self.level[learnt[1] >> 1]
+
+    def bump(self, v):
+        # Only assigned variables are bumped; they re-enter the heap with
+        # their new activity when cancel_until() frees them.
+        self.activity[v] += self.bump_by
+        if self.activity[v] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.bump_by *= 1e-100
+            self.heap = [(-self.activity[u], u) for u in range(len(self.value)) if not self.value[u]]
+            heapq.heapify(self.heap)
+
+    def decide(self):
+        """Pop the open variable with the highest activity, or None if all are set."""
+        heap = self.heap
+        while heap:
+            neg_activity, v = heapq.heappop(heap)
+            if not self.value[v] and -neg_activity == self.activity[v]:
+                return v
+        return None
+
+    def solve(self, conflict_limit=None):
+        """Return the solved cells, or None if the puzzle has no solution.
+
+        Raises SearchLimitReached after conflict_limit conflicts.
+        """
+        if not self.valid:
+            return None
+        restart_at = self.RESTART_CONFLICTS
+        since_restart = 0
+        while True:
+            try:
+                self.propagate()
+            except _Conflict:
+                if not self.level_starts:
+                    return None
+                self.conflicts += 1
+                if conflict_limit is not None and self.conflicts > conflict_limit:
+                    raise SearchLimitReached
+                since_restart += 1
+                learnt, level = self.analyze()
+                self.cancel_until(level)
+                self.bump_by *= self.ACTIVITY_GROWTH
+                if len(learnt) > 1:
+                    self.watches.setdefault(learnt[0], []).append(learnt)
+                    self.watches.setdefault(learnt[1], []).append(learnt)
+                    self.set_literal(learnt[0], ("clause", learnt))
+                else:
+                    self.set_literal(learnt[0], ("given",))
+                continue
+            if since_restart >= restart_at:
+                since_restart = 0
+                restart_at = int(restart_at * self.RESTART_GROWTH)
+                self.cancel_until(0)
+                continue
+            v = self.decide()
+            if v is None:
+                return list(self.placed)
+            self.level_starts.append(len(self.trail))
+            self.set_true(v, ("decision",))
+
+
+class BoardState:
+    """Digit counts per row, column and box for a board the player is filling.
+
+    Wraps the 2D board in place; place() keeps the counts, the number of
+    filled cells and the number of duplicate digits in sync, so conflict and
+    completion checks never rescan the grid.
+    """
+
+    def __init__(self, board):
+        self.board = board
+        self.size = size = len(board)
+        self.box = math.isqrt(size)
+        self.row_counts = [[0] * (size + 1) for _ in range(size)]
+        self.col_counts = [[0] * (size + 1) for _ in range(size)]
+        self.box_counts = [[0] * (size + 1) for _ in range(size)]
+        self.filled = 0
+        self.duplicates = 0
+        for r in range(size):
+            for c in range(size):
+                if board[r][c]:
+                    self._add(r, c, board[r][c])
+
+    def _counts(self, row, col):
+        box = self.box
+        return (
+            self.row_counts[row],
+            self.col_counts[col],
+            self.box_counts[(row // box) * box + col // box],
+        )
+
+    def _add(self, row, col, value):
+        for counts in self._counts(row, col):
+            if counts[value]:
+                self.duplicates += 1
+            counts[value] += 1
+        self.filled += 1
+
+    def _remove(self, row, col, value):
+        for counts in self._counts(row, col):
+            counts[value] -= 1
+            if counts[value]:
+                self.duplicates -= 1
+        self.filled -= 1
+
+    def place(self, row, col, value):
+        """Set a cell (0 clears it) and update the counts."""
+        old = self.board[row][col]
+        if old:
+            self._remove(row, col, old)
+        self.board[row][col] = value
+        if value:
+            self._add(row, col, value)
+
+    def is_conflict(self, row, col):
+        value = self.board[row][col]
+        return bool(value) and any(counts[value] > 1 for counts in self._counts(row, col))
+
+    @property
+    def has_conflicts(self):
+        return self.duplicates > 0
+
+    @property
+    def is_solved(self):
+        return self.filled == self.size * self.size and not self.duplicates
+
+
+def solve_cells(cells, backtrack_nodes=BACKTRACK_NODES, conflict_limit=CONFLICT_LIMIT):
+    """Solve a flat puzzle of any supported size, returning the solved cells or None.
+
+    Plain backtracking gets backtrack_nodes nodes, which is plenty for classic
+    puzzles and for anything singles open up. Search times on sparse 16x16
+    and 25x25 boards are heavy-tailed, so past that the puzzle goes to
+    LearningSolver, which keeps what every dead end taught it instead of
+    starting over. Raises SearchLimitReached once that has also run into
+    conflict_limit conflicts, so no board can hold the caller indefinitely.
+    """
+    solver = BitmaskSolver(cells)
+    solver.node_limit = backtrack_nodes
+    try:
+        return solver.cells if solver.solve() else None
+    except SearchLimitReached:
+        pass
+    return LearningSolver(cells).solve(conflict_limit)
+
+
+def count_solutions(cells, limit=2):
+    """Count the solutions of a flat puzzle, giving up once limit is reached."""
+    solver = BitmaskSolver(cells)
+    if not solver.valid:
+        return 0
+    return solver.count(limit)
+
+
+def has_other_solution(cells, i, value):
+    """Check whether a puzzle has a solution with something other than value at i.
+
+    When one solution is already known this settles uniqueness with a single
+    search instead of counting up to two.
+    """
+    solver = BitmaskSolver(cells)
+    if not solver.valid:
+        return False
+    for bit in solver.branch_order(solver.candidates(i) & ~(1 << (value - 1))):
+        solver.place(i, bit)
+        if solver.search():
+            return True
+        solver.unplace(i)
+    return False
+
+
+# --- Generation and grading ---
+
+DIFFICULTIES = ("Easy", "Medium", "Hard")
+# Clue floors for a 9x9 board, scaled by cell count for larger ones.
+MIN_CLUES = {"Easy": 36, "Medium": 28, "Hard": 17}
+# Seconds spent thinning a peeled board larger than 9x9 with full singles checks.
+LARGE_BOARD_BUDGET = 0.3
+
+
+def logical_level(cells):
+    """Return the index into DIFFICULTIES of the techniques a puzzle needs.
+
+    Easy puzzles fall to naked singles alone, Medium ones also need hidden
+    singles, and Hard ones cannot be finished without guessing. Returns None
+    for puzzles that contradict themselves.
+    """
+    solver = BitmaskSolver(cells)
+    if not solver.valid:
+        return None
+    trail = []
+    level = 0
+    while True:
+        naked = solver.fill_naked_singles(trail)
+        if naked < 0:
+            return None
+        if naked:
+            continue
+        hidden = solver.fill_hidden_singles(trail)
+        if hidden < 0:
+            return None
+        if not hidden:
+            break
+        level = 1
+    return level if all(solver.cells) else 2
+
+
+def grade_cells(cells):
+    level = logical_level(cells)
+    return None if level is None else DIFFICULTIES[level]
+
+
+def random_full_grid(rng, box=BOX):
+    """Return a random solved grid as flat cells.
+
+    Classic boards come straight out of a randomized search. Larger ones
+    start from the standard shifted-row pattern and are scrambled with
+    validity-preserving shuffles (digits, rows within bands, bands, and the
+    same for columns), which is instant where a blank search may stall.
+    """
+    geo = geometry(box)
+    if box == BOX:
+        solver = BitmaskSolver([0] * geo.cells, rng=rng)
+        solver.solve()
+        return solver.cells
+    size = geo.size
+    digits = list(range(1, size + 1))
+    rng.shuffle(digits)
+
+    def shuffled_lines():
+        bands = list(range(box))
+        rng.shuffle(bands)
+        lines = []
+        for band in bands:
+            inner = list(range(box))
+            rng.shuffle(inner)
+            lines.extend(band * box + k for k in inner)
+        return lines
+
+    rows, cols = shuffled_lines(), shuffled_lines()
+    return [digits[(box * (r % box) + r // box + c) % size] for r in rows for c in cols]
+
+
+def _is_forced(state, row, col, value, hidden):
+    """Check whether a blank cell is pinned to value by its peers' clues.
+
+    True when every other digit already sits among the cell's peers (a naked
+    single) or, if hidden is set, when value is ruled out of every other
+    blank cell of one of its units (a hidden single).
+    """
+    rows, cols, boxes = state.row_counts, state.col_counts, state.box_counts
+    box = state.box
+    b = (row // box) * box + col // box
+    if all(rows[row][d] or cols[col][d] or boxes[b][d] for d in range(1, state.size + 1) if d != value):
+        return True
+    if not hidden:
+        return False
+
+    def blocked(r, c):
+        return state.board[r][c] or rows[r][value] or cols[c][value] or boxes[(r // box) * box + c // box][value]
+
+    size = state.size
+    if all(blocked(row, c) for c in range(size) if c != col):
+        return True
+    if all(blocked(r, col) for r in range(size) if r != row):
+        return True
+    top, left = (row // box) * box, (col // box) * box
+    return all(
+        blocked(r, c)
+        for r in range(top, top + box)
+        for c in range(left, left + box)
+        if (r, c) != (row, col)
+    )
+
+
+def _peel_puzzle(solution, box, difficulty, floor, rng):
+    """Remove clues from a large board in one linear pass.
+
+    A clue is only removed when the remaining clues force it back as a
+    single, so the puzzle can always be refilled by reversing the removals
+    and stays unique without running the solver at every step. The result
+    is then thinned further with full singles checks for as long as
+    LARGE_BOARD_BUDGET allows.
+    """
+    state = BoardState(unflatten(solution[:]))
+    order = list(range(len(solution)))
+    rng.shuffle(order)
+    clues = len(solution)
+    size = box * box
+    for i in order:
+        if clues <= floor:
+            break
+        row, col = divmod(i, size)
+        value = state.board[row][col]
+        state.place(row, col, 0)
+        if _is_forced(state, row, col, value, difficulty != "Easy"):
+            clues -= 1
+        else:
+            state.place(row, col, value)
+
+    puzzle = flatten(state.board)
+    target = DIFFICULTIES.index(difficulty)
+    deadline = time.perf_counter() + LARGE_BOARD_BUDGET
+    for i in order:
+        if clues <= floor or time.perf_counter() > deadline:
+            break
+        value = puzzle[i]
+        if not value:
+            continue
+        puzzle[i] = 0
+        level = logical_level(puzzle)
+        if level is not None and level <= min(target, 1):
+            clues -= 1
+        else:
+            puzzle[i] = value
+    return puzzle
+
+
+def generate_puzzle(difficulty="Medium", rng=None, box=BOX):
+    """Generate a puzzle with a unique solution.
+
+    Clues are removed from a random full grid in random order, and each
+    removal is kept only while the puzzle stays within reach of the
+    requested difficulty: singles-only for Easy and Medium, which also
+    guarantees uniqueness, and no alternative solution for Hard.
+    Removal stops early once the difficulty's clue floor is reached.
+    Boards larger than 9x9 use the single-pass peel in _peel_puzzle, so
+    Medium and Hard coincide there.
+    Returns (puzzle, solution, grade) as flat cell lists plus the grade the
+    finished puzzle actually earned.
+    """
+    rng = rng or random.Random()
+    target = DIFFICULTIES.index(difficulty)
+    geo = geometry(box)
+    floor = MIN_CLUES[difficulty] * geo.cells // 81
+    solution = random_full_grid(rng, box)
+    if box != BOX:
+        puzzle = _peel_puzzle(solution, box, difficulty, floor, rng)
+        return puzzle, solution, grade_cells(puzzle)
+    puzzle = solution[:]
+    order = list(range(geo.cells))
+    rng.shuffle(order)
+    clues = geo.cells
+    for i in order:
+        if clues <= floor:
+            break
+        value = puzzle[i]
+        puzzle[i] = 0
+        if target < 2:
+            level = logical_level(puzzle)
+            keep = level is not None and level <= target
+        else:
+            keep = not has_other_solution(puzzle, i, value)
+        if keep:
+            clues -= 1
+        else:
+            puzzle[i] = value
+    return puzzle, solution, grade_cells(puzzle)
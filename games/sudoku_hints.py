@@ -0,0 +1,244 @@
+# games/sudoku_hints.py
+#
+# Human-style hints for the Sudoku page. CandidateGrid keeps a bitmask of
+# pencil marks per cell next to the BoardState, updated as the player moves,
+# and find_hint() looks for the next logical step on those marks in order of
+# difficulty: naked single, hidden single, pointing pair, naked pair, naked
+# triple and X-wing.
+
+from itertools import combinations
+
+from games.sudoku_engine import bit_count, geometry
+
+
+def digits_of(mask):
+    return [d for d in range(1, mask.bit_length() + 1) if mask >> (d - 1) & 1]
+
+
+class CandidateGrid:
+    """Pencil marks for every blank cell, kept in step with a BoardState.
+
+    Filling a blank cell only clears that digit from the cell's peers.
+    Clearing or overwriting a cell rebuilds the marks from the digit counts,
+    dropping eliminations made by earlier hints since they may no longer
+    hold.
+    """
+
+    def __init__(self, tracker):
+        self.tracker = tracker
+        self.geo = geometry(tracker.box)
+        self.rebuild()
+
+    def rebuild(self):
+        self.cands = [self._base(i) for i in range(self.geo.cells)]
+
+    def _base(self, i):
+        tracker = self.tracker
+        r, c, b = self.geo.coords[i]
+        if tracker.board[r][c]:
+            return 0
+        rows, cols, boxes = tracker.row_counts[r], tracker.col_counts[c], tracker.box_counts[b]
+        mask = 0
+        for d in range(1, self.geo.size + 1):
+            if not (rows[d] or cols[d] or boxes[d]):
+                mask |= 1 << (d - 1)
+        return mask
+
+    def place(self, row, col, value):
+        old = self.tracker.board[row][col]
+        self.tracker.place(row, col, value)
+        if old or not value:
+            self.rebuild()
+            return
+        i = row * self.geo.size + col
+        self.cands[i] = 0
+        keep = ~(1 << (value - 1))
+        for p in self.geo.peers[i]:
+            self.cands[p] &= keep
+
+    def apply(self, hint):
+        """Remove the candidates a hint eliminated."""
+        size = self.geo.size
+        for row, col, value in hint['eliminations']:
+            self.cands[row * size + col] &= ~(1 << (value - 1))
+
+
+def _cell(geo, i):
+    return divmod(i, geo.size)
+
+
+def _name(geo, i):
+    row, col = _cell(geo, i)
+    return f"R{row + 1}C{col + 1}"
+
+
+def _unit_name(geo, u):
+    kind = ("row", "column", "box")[u // geo.size]
+    return f"{kind} {u % geo.size + 1}"
+
+
+def _hint(geo, technique, message, cells, related=(), place=None, eliminations=()):
+    return {
+        'technique': technique,
+        'message': message,
+        'cells': [_cell(geo, i) for i in cells],
+        'related': [_cell(geo, i) for i in related],
+        'place': place,
+        'eliminations': list(eliminations),
+    }
+
+
+def _eliminate(geo, cands, targets, mask):
+    """Return (row, col, digit) triples for mask's digits present in targets."""
+    found = []
+    for i in targets:
+        hit = cands[i] & mask
+        for d in digits_of(hit):
+            found.append(_cell(geo, i) + (d,))
+    return found
+
+
+def _naked_single(geo, cands, board_cells):
+    for i, cand in enumerate(cands):
+        if not board_cells[i] and cand and cand & (cand - 1) == 0:
+            d = cand.bit_length()
+            return _hint(
+                geo, "Naked single",
+                f"{_name(geo, i)} can only be {d}: every other digit is already in its row, column or box.",
+                [i], place=_cell(geo, i) + (d,),
+            )
+    return None
+
+
+def _hidden_single(geo, cands):
+    for u, unit in enumerate(geo.units):
+        for d in range(1, geo.size + 1):
+            bit = 1 << (d - 1)
+            homes = [i for i in unit if cands[i] & bit]
+            if len(homes) == 1:
+                i = homes[0]
+                return _hint(
+                    geo, "Hidden single",
+                    f"{d} has only one place left in {_unit_name(geo, u)}: {_name(geo, i)}.",
+                    [i], related=unit, place=_cell(geo, i) + (d,),
+                )
+    return None
+
+
+def _pointing(geo, cands):
+    size = geo.size
+    for b in range(size):
+        box_unit = geo.units[2 * size + b]
+        for d in range(1, size + 1):
+            bit = 1 << (d - 1)
+            homes = [i for i in box_unit if cands[i] & bit]
+            if not 2 <= len(homes) <= geo.box:
+                continue
+            for line, line_of in ((geo.row_of, 0), (geo.col_of, size)):
+                if len({line[i] for i in homes}) != 1:
+                    continue
+                u = line_of + line[homes[0]]
+                targets = [i for i in geo.units[u] if geo.box_of[i] != b]
+                eliminations = _eliminate(geo, cands, targets, bit)
+                if eliminations:
+                    kind = "pair" if len(homes) == 2 else "triple"
+                    return _hint(
+                        geo, f"Pointing {kind}",
+                        f"In {_unit_name(geo, 2 * size + b)}, {d} can only go in "
+                        f"{', '.join(_name(geo, i) for i in homes)}, all in {_unit_name(geo, u)}, "
+                        f"so {d} can be removed from the rest of {_unit_name(geo, u)}.",
+                        homes, related=targets, eliminations=eliminations,
+                    )
+    return None
+
+
+def _naked_subset(geo, cands, k):
+    for u, unit in enumerate(geo.units):
+        open_cells = [i for i in unit if cands[i] and bit_count(cands[i]) <= k]
+        for group in combinations(open_cells, k):
+            mask = 0
+            for i in group:
+                mask |= cands[i]
+            if bit_count(mask) != k:
+                continue
+            targets = [i for i in unit if i not in group and cands[i]]
+            eliminations = _eliminate(geo, cands, targets, mask)
+            if eliminations:
+                technique = "Naked pair" if k == 2 else "Naked triple"
+                digits = ", ".join(map(str, digits_of(mask)))
+                return _hint(
+                    geo, technique,
+                    f"{', '.join(_name(geo, i) for i in group)} share the candidates {digits} in "
+                    f"{_unit_name(geo, u)}, so those digits can be removed from its other cells.",
+                    group, related=targets, eliminations=eliminations,
+                )
+    return None
+
+
+def _x_wing(geo, cands):
+    size = geo.size
+    for base, cover in ((0, size), (size, 0)):
+        for d in range(1, size + 1):
+            bit = 1 << (d - 1)
+            lines = {}
+            for k in range(size):
+                homes = [i for i in geo.units[base + k] if cands[i] & bit]
+                if len(homes) == 2:
+                    cross = tuple(geo.col_of[i] if base == 0 else geo.row_of[i] for i in homes)
+                    lines.setdefault(cross, []).append(homes)
+            for cross, found in lines.items():
+                if len(found) < 2:
+                    continue
+                corners = found[0] + found[1]
+                targets = [
+                    i for c in cross for i in geo.units[cover + c]
+                    if i not in corners
+                ]
+                eliminations = _eliminate(geo, cands, targets, bit)
+                if eliminations:
+                    kind = "rows" if base == 0 else "columns"
+                    return _hint(
+                        geo, "X-wing",
+                        f"In two {kind}, {d} can only go in the corners "
+                        f"{', '.join(_name(geo, i) for i in corners)}, so {d} can be removed "
+                        f"from the rest of the {'columns' if base == 0 else 'rows'} they span.",
+                        corners, related=targets, eliminations=eliminations,
+                    )
+    return None
+
+
+def find_hint(grid):
+    """Return the easiest next step for the grid as a hint dict, or None.
+
+    Hints carry the technique, a message, the cells involved, the related
+    cells they act on, and either a (row, col, value) placement or a list of
+    (row, col, value) candidate eliminations.
+    """
+    geo = grid.geo
+    tracker = grid.tracker
+    size = geo.size
+    if tracker.has_conflicts:
+        clashes = [
+            i for i in range(geo.cells)
+            if tracker.is_conflict(*divmod(i, size))
+        ]
+        return _hint(geo, "Conflict", "Fix the clashing numbers first.", clashes)
+
+    board_cells = [value for row in tracker.board for value in row]
+    cands = grid.cands
+    for i, cand in enumerate(cands):
+        if not board_cells[i] and not cand:
+            return _hint(
+                geo, "Dead end",
+                f"{_name(geo, i)} has no candidates left, so one of the numbers placed so far is wrong.",
+                [i], related=geo.peers[i],
+            )
+
+    return (
+        _naked_single(geo, cands, board_cells)
+        or _hidden_single(geo, cands)
+        or _pointing(geo, cands)
+        or _naked_subset(geo, cands, 2)
+        or _naked_subset(geo, cands, 3)
+        or _x_wing(geo, cands)
+    )
@@ -1,14 +1,48 @@
 import streamlit as st
 import numpy as np
-import time
 import random
+from games.tic_tac_toe_engine import best_move
+from games.mnk_engine import MNKBoard
+from games.mnk_ai import choose_move
+from games.ai_service import POLL_SECONDS, cancel_move, request_move, take_result
+
+MARKS = ('X', 'O')
+
+# Board rows, columns and win length of each variant; "Custom" asks for them.
+VARIANTS = {
+    "Tic Tac Toe (3×3, three in a row)": (3, 3, 3),
+    "Gomoku (15×15, five in a row)": (15, 15, 5),
+    "Custom": None,
+}
+HARD_TIME_BUDGET = 1.0
+
+def new_board(rows=3, cols=3):
+    return np.array([[' ' for _ in range(cols)] for _ in range(rows)])
+
+def get_engine():
+    """Return the m,n,k engine for the current board, rebuilding it if it is out of sync."""
+    board = st.session_state.ttt_board
+    k = st.session_state.get('ttt_k', 3)
+    engine = st.session_state.get('ttt_engine')
+    placed = int(np.count_nonzero(board != ' '))
+    if engine is None or engine.moves != placed or (engine.rows, engine.cols, engine.k) != (*board.shape, k):
+        engine = MNKBoard.from_rows(board.tolist(), k, MARKS)
+        st.session_state.ttt_engine = engine
+    return engine
+
+def place_mark(i, j, mark):
+    """Put mark on the board and return True if it wins."""
+    engine = get_engine()
+    st.session_state.ttt_board[i, j] = mark
+    return engine.play(i * engine.cols + j, MARKS.index(mark) + 1)
 
 def render_tic_tac_toe():
     st.title("Tic Tac Toe with AI")
     
     # Initialize the board if it doesn't exist
     if 'ttt_board' not in st.session_state:
-        st.session_state.ttt_board = np.array([[' ' for _ in range(3)] for _ in range(3)])
+        st.session_state.ttt_board = new_board()
+        st.session_state.ttt_k = 3
         st.session_state.game_over = False
         st.session_state.winner = None
         st.session_state.human_turn = True
@@ -25,13 +59,33 @@ def render_tic_tac_toe():
         
         if difficulty != st.session_state.difficulty:
             st.session_state.difficulty = difficulty
-        
+
+        # Board size and win length
+        variant = st.selectbox("Board", list(VARIANTS))
+        if VARIANTS[variant] is None:
+            c1, c2, c3 = st.columns(3)
+            rows = c1.number_input("Rows", min_value=3, max_value=19, value=9)
+            cols = c2.number_input("Columns", min_value=3, max_value=19, value=9)
+            k = c3.number_input("In a row to win", min_value=3, max_value=int(max(rows, cols)), value=4)
+            shape = (int(rows), int(cols), int(k))
+        else:
+            shape = VARIANTS[variant]
+        current = (*st.session_state.ttt_board.shape, st.session_state.get('ttt_k', 3))
+
         # Reset game button
-        if st.button("Start New Game"):
-            st.session_state.ttt_board = np.array([[' ' for _ in range(3)] for _ in range(3)])
+        if st.button("Start New Game") or shape != current:
+            cancel_move(st.session_state, 'ttt_ai_future')
+            st.session_state.ttt_board = new_board(shape[0], shape[1])
+            st.session_state.ttt_k = shape[2]
+            st.session_state.ttt_engine = None
             st.session_state.game_over = False
             st.session_state.winner = None
             st.session_state.human_turn = True
+
+    rows, cols = st.session_state.ttt_board.shape
+    k = st.session_state.get('ttt_k', 3)
+    if (rows, cols, k) != (3, 3, 3):
+        st.caption(f"{rows}×{cols} board, {k} in a row wins")
     
     # Display game status
     if st.session_state.game_over:
@@ -47,11 +101,11 @@ def render_tic_tac_toe():
         else:
             st.info("AI's turn (O)")
     
-    # Create a 3x3 grid of buttons for the tic tac toe game
-    cols = st.columns(3)
-    for i in range(3):
-        for j in range(3):
-            with cols[j]:
+    # Create a grid of buttons for the board
+    grid = st.columns(cols)
+    for i in range(rows):
+        for j in range(cols):
+            with grid[j]:
                 # Get the current cell value
                 cell_value = st.session_state.ttt_board[i, j]
                 
@@ -59,11 +113,11 @@ def render_tic_tac_toe():
                 if cell_value == ' ' and not st.session_state.game_over and st.session_state.human_turn:
                     if st.button(f"   ", key=f"ttt_{i}_{j}", use_container_width=True):
                         # Human makes a move
-                        st.session_state.ttt_board[i, j] = 'X'
+                        won = place_mark(i, j, 'X')
                         st.session_state.human_turn = False
                         
                         # Check if the game is over after human's move
-                        if check_winner(st.session_state.ttt_board, 'X'):
+                        if won:
                             st.session_state.game_over = True
                             st.session_state.winner = 'X'
                         elif is_full(st.session_state.ttt_board):
@@ -77,147 +131,68 @@ def render_tic_tac_toe():
                     button_label = "X" if cell_value == 'X' else "O" if cell_value == 'O' else " "
                     st.button(button_label, key=f"ttt_{i}_{j}", disabled=True, use_container_width=True)
     
-    # AI's turn
+    # AI's turn: the move is worked out in the background and picked up by poll_ai_turn
     if not st.session_state.human_turn and not st.session_state.game_over:
-        # Add a small delay to make it seem like the AI is thinking
-        time.sleep(0.5)
-        
-        # AI makes a move based on the difficulty
-        if st.session_state.difficulty == "Easy":
-            ai_move_easy()
-        elif st.session_state.difficulty == "Medium":
-            ai_move_medium()
-        else:  # Hard
-            ai_move_minimax()
-        
-        # Check if the game is over after AI's move
-        if check_winner(st.session_state.ttt_board, 'O'):
-            st.session_state.game_over = True
-            st.session_state.winner = 'O'
-        elif is_full(st.session_state.ttt_board):
-            st.session_state.game_over = True
-            st.session_state.winner = None
-        
-        # Human's turn again
-        st.session_state.human_turn = True
-        
-        # Rerun to update the UI
-        st.rerun()
+        if st.session_state.get('ttt_ai_future') is None:
+            request_move(
+                st.session_state, 'ttt_ai_future', pick_ai_cell,
+                get_engine().copy(), st.session_state.difficulty,
+            )
+        poll_ai_turn()
 
-def check_winner(board, player):
-    # Check rows
-    for i in range(3):
-        if np.all(board[i, :] == player):
-            return True
+@st.fragment(run_every=POLL_SECONDS)
+def poll_ai_turn():
+    done, cell = take_result(st.session_state, 'ttt_ai_future')
+    if not done:
+        return
+    if cell is not None:
+        place_mark(*divmod(cell, st.session_state.ttt_board.shape[1]), 'O')
     
-    # Check columns
-    for i in range(3):
-        if np.all(board[:, i] == player):
-            return True
+    # Check if the game is over after AI's move
+    if get_engine().winner == 2:
+        st.session_state.game_over = True
+        st.session_state.winner = 'O'
+    elif is_full(st.session_state.ttt_board):
+        st.session_state.game_over = True
+        st.session_state.winner = None
     
-    # Check diagonals
-    if board[0, 0] == board[1, 1] == board[2, 2] == player:
-        return True
-    if board[0, 2] == board[1, 1] == board[2, 0] == player:
-        return True
+    # Human's turn again
+    st.session_state.human_turn = True
     
-    return False
+    # Rerun to update the UI
+    st.rerun()
+
+def check_winner(board, player, k=3):
+    return MNKBoard.from_rows(board.tolist(), k, MARKS).winner == MARKS.index(player) + 1
 
 def is_full(board):
     return ' ' not in board
 
 def get_empty_cells(board):
-    empty_cells = []
-    for i in range(3):
-        for j in range(3):
-            if board[i, j] == ' ':
-                empty_cells.append((i, j))
-    return empty_cells
+    return [tuple(cell) for cell in np.argwhere(board == ' ')]
 
-def ai_move_easy():
-    """AI makes a random move"""
-    empty_cells = get_empty_cells(st.session_state.ttt_board)
-    if empty_cells:
-        i, j = random.choice(empty_cells)
-        st.session_state.ttt_board[i, j] = 'O'
+def pick_ai_cell(engine, difficulty, stop=None):
+    """Return the flat index of the AI's (O's) move, or None if the board is full.
 
-def ai_move_medium():
-    """
-    AI with medium difficulty:
-    1. If AI can win in the next move, make that move
-    2. If player can win in the next move, block that move
-    3. Otherwise, make a random move
+    Runs on the AI service's worker threads, so it only touches the engine it is given.
     """
-    board = st.session_state.ttt_board.copy()
-    empty_cells = get_empty_cells(board)
-    
-    # Check if AI can win in the next move
-    for i, j in empty_cells:
-        board[i, j] = 'O'
-        if check_winner(board, 'O'):
-            st.session_state.ttt_board[i, j] = 'O'
-            return
-        board[i, j] = ' '  # Reset
-    
-    # Check if player can win in the next move and block
-    for i, j in empty_cells:
-        board[i, j] = 'X'
-        if check_winner(board, 'X'):
-            st.session_state.ttt_board[i, j] = 'O'
-            return
-        board[i, j] = ' '  # Reset
-    
-    # Make a random move
-    ai_move_easy()
-
-def minimax(board, depth, is_maximizing):
-    """Minimax algorithm for unbeatable AI"""
-    # Check terminal states
-    if check_winner(board, 'O'):
-        return 10 - depth
-    if check_winner(board, 'X'):
-        return depth - 10
-    if is_full(board):
-        return 0
-    
-    if is_maximizing:
-        best_score = float('-inf')
-        for i in range(3):
-            for j in range(3):
-                if board[i, j] == ' ':
-                    board[i, j] = 'O'
-                    score = minimax(board, depth + 1, False)
-                    board[i, j] = ' '  # Reset
-                    best_score = max(score, best_score)
-        return best_score
-    else:
-        best_score = float('inf')
-        for i in range(3):
-            for j in range(3):
-                if board[i, j] == ' ':
-                    board[i, j] = 'X'
-                    score = minimax(board, depth + 1, True)
-                    board[i, j] = ' '  # Reset
-                    best_score = min(score, best_score)
-        return best_score
-
-def ai_move_minimax():
-    """Make the best move using minimax algorithm"""
-    best_score = float('-inf')
-    best_move = None
-    board = st.session_state.ttt_board.copy()
-    
-    for i in range(3):
-        for j in range(3):
-            if board[i, j] == ' ':
-                board[i, j] = 'O'
-                score = minimax(board, 0, False)
-                board[i, j] = ' '  # Reset
-                
-                if score > best_score:
-                    best_score = score
-                    best_move = (i, j)
-    
-    if best_move:
-        i, j = best_move
-        st.session_state.ttt_board[i, j] = 'O'
\ No newline at end of file
+    empty_cells = engine.empty_cells()
+    if not empty_cells:
+        return None
+    if difficulty == "Easy":
+        return random.choice(empty_cells)
+    if difficulty == "Medium":
+        # Win if possible, otherwise block the player's win, otherwise play randomly
+        for player in (2, 1):
+            for cell in empty_cells:
+                won = engine.play(cell, player)
+                engine.undo()
+                if won:
+                    return cell
+        return random.choice(empty_cells)
+    if (engine.rows, engine.cols, engine.k) == (3, 3, 3):
+        # Perfect play from the precomputed game tree
+        return best_move(engine.cells)
+    # Alpha-beta search over threat-ranked candidate cells, for boards too big to solve
+    cell, _ = choose_move(engine, 2, HARD_TIME_BUDGET, stop=stop)
+    return cell
@@ -0,0 +1,120 @@
+# games/tic_tac_toe_engine.py
+#
+# Solved game tree behind the Hard AI in games/tic_tac_toe.py. A board is a
+# flat list of 9 cells (0 empty, 1 X, 2 O), row by row, and its key is the
+# base-3 number those cells spell. Rotations and reflections of a board
+# share one entry: the canonical key is the smallest key among its 8
+# symmetric images, which cuts the 5,478 legal positions down to 765.
+#
+# The table is solved once per process on first use and shared by every
+# session, so each AI move is one canonicalization and one dict lookup.
+
+from functools import lru_cache
+
+EMPTY, X, O = 0, 1, 2
+CELLS = 9
+LINES = (
+    (0, 1, 2), (3, 4, 5), (6, 7, 8),
+    (0, 3, 6), (1, 4, 7), (2, 5, 8),
+    (0, 4, 8), (2, 4, 6),
+)
+POWERS = tuple(3 ** i for i in range(CELLS))
+
+
+def _rotate(perm):
+    # Cell (r, c) of the rotated board comes from cell (2 - c, r).
+    return tuple(perm[(2 - i % 3) * 3 + i // 3] for i in range(CELLS))
+
+
+def _mirror(perm):
+    return tuple(perm[(i // 3) * 3 + 2 - i % 3] for i in range(CELLS))
+
+
+# Each symmetry as a permutation: cell i of the transformed board is cell
+# perm[i] of the original.
+SYMMETRIES = []
+_perm = tuple(range(CELLS))
+for _ in range(4):
+    SYMMETRIES.append(_perm)
+    SYMMETRIES.append(_mirror(_perm))
+    _perm = _rotate(_perm)
+SYMMETRIES = tuple(SYMMETRIES)
+
+
+def position_key(cells):
+    return sum(value * power for value, power in zip(cells, POWERS))
+
+
+def canonical(cells):
+    """Return (key, perm) for the smallest symmetric image of cells."""
+    best_key, best_perm = None, None
+    for perm in SYMMETRIES:
+        key = sum(cells[src] * power for src, power in zip(perm, POWERS))
+        if best_key is None or key < best_key:
+            best_key, best_perm = key, perm
+    return best_key, best_perm
+
+
+def winner(cells):
+    for a, b, c in LINES:
+        if cells[a] and cells[a] == cells[b] == cells[c]:
+            return cells[a]
+    return None
+
+
+def to_move(cells):
+    """X moves first, so O is to move whenever X has more marks."""
+    return O if cells.count(X) > cells.count(O) else X
+
+
+@lru_cache(maxsize=None)
+def solved_table():
+    """Solve every position reachable from the empty board.
+
+    Maps canonical key -> (score, best_cell), where score is from the point
+    of view of the player to move (positive wins, sooner wins score higher)
+    and best_cell is in the canonical orientation, or -1 once the game is
+    over.
+    """
+    table = {}
+
+    def solve(cells):
+        key, perm = canonical(cells)
+        entry = table.get(key)
+        if entry is not None:
+            return entry[0]
+        player = to_move(cells)
+        empties = [i for i in range(CELLS) if cells[i] == EMPTY]
+        if winner(cells) is not None:
+            # The previous player just completed a line; faster losses score lower.
+            score = -1 - len(empties)
+            table[key] = (score, -1)
+            return score
+        if not empties:
+            table[key] = (0, -1)
+            return 0
+        best, best_cell = None, -1
+        for cell in empties:
+            cells[cell] = player
+            score = -solve(cells)
+            cells[cell] = EMPTY
+            if best is None or score > best:
+                best, best_cell = score, cell
+        # Store the move in canonical orientation: canonical cell i is cells[perm[i]].
+        table[key] = (best, perm.index(best_cell))
+        return best
+
+    solve([EMPTY] * CELLS)
+    return table
+
+
+def best_move(cells):
+    """Return the index of a perfect-play move for the player to move, or None."""
+    key, perm = canonical(cells)
+    score, cell = solved_table()[key]
+    return None if cell < 0 else perm[cell]
+
+
+def position_score(cells):
+    """Perfect-play score of cells for the player to move."""
+    return solved_table()[canonical(cells)[0]][0]
@@ -1,10 +1,16 @@
 import streamlit as st
 import pandas as pd
 import time
+from games.game_2048_replay import verify_replay
 
-def update_leaderboard(game, player_name, value=1):
+def update_leaderboard(game, player_name, value=1, replay=None):
+    """Record a result; returns False when it was not recorded."""
     if player_name == 'Player':
-        return
+        return False
+    
+    # A 2048 score only counts with a replay log that plays back to it
+    if game == '2048' and (replay is None or verify_replay(replay) != value):
+        return False
         
     if game not in st.session_state.leaderboard:
         st.session_state.leaderboard[game] = {'scores': {}, 'times': {}}
@@ -22,15 +28,19 @@ def update_leaderboard(game, player_name, value=1):
     # Update the metric
     if player_name in st.session_state.leaderboard[game][metric]:
         if game == '2048':
-            st.session_state.leaderboard[game][metric][player_name] = max(
-                st.session_state.leaderboard[game][metric][player_name], value)
+            if value > st.session_state.leaderboard[game][metric][player_name]:
+                st.session_state.leaderboard[game][metric][player_name] = value
+                st.session_state.leaderboard[game].setdefault('replays', {})[player_name] = replay
         else:
             st.session_state.leaderboard[game][metric][player_name] += value
     else:
         st.session_state.leaderboard[game][metric][player_name] = value
+        if replay is not None:
+            st.session_state.leaderboard[game].setdefault('replays', {})[player_name] = replay
     
     # Update time
     st.session_state.leaderboard[game]['times'][player_name] = time.strftime("%Y-%m-%d %H:%M:%S")
+    return True
 
 def display_leaderboard():
     st.title("Leaderboard")